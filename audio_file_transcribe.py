@@ -2,44 +2,168 @@
 """
 Force Transcribe - Simple audio file transcription utility
 Only prints the transcribed text without any additional processing.
+
+Loading the Whisper model dominates the cost of a short clip, so several
+files can be transcribed by one process (and one model):
+
+    python audio_file_transcribe.py a.wav b.wav c.wav      # one model, sequential
+    python audio_file_transcribe.py --jobs 4 *.wav         # one model per worker
+    python audio_file_transcribe.py --batch *.wav          # batched forward passes
+    ls *.wav | python audio_file_transcribe.py --stdin-loop
 """
 
 import sys
 import os
-from speech_analysis.stt import JarvisSTT
+import argparse
+from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from config_manager import get_config
+from speech_analysis.stt import JarvisSTT, transcription_cache_path, store_cached_transcription
+
+
+# Whisper model size used by every mode (--batch loads the same size through transformers)
+MODEL_NAME = "base"
+
+# STT engine for this process, loaded once and reused for every file
+_stt = None
+
+
+def _init_stt():
+    """Load the STT engine for this process (also used as pool initializer)"""
+    global _stt
+    if _stt is None:
+        # Initialize STT with Whisper (more accurate for file transcription);
+        # the CTranslate2 int8 backend falls back to openai-whisper if missing
+        _stt = JarvisSTT(stt_engine="faster-whisper", model_name=MODEL_NAME)
+
+
+def transcribe_one(audio_file: str) -> str:
+    """Transcribe a single file with the process-wide STT engine"""
+    _init_stt()
+    return _stt.transcribe_file(audio_file)
+
+
+def transcribe_files(audio_files: List[str], batch_size: int = 16) -> List[str]:
+    """Transcribe many files with batched Whisper forward passes, in input order
+
+    Needs transformers and librosa (see requirements.txt); falls back to sequential
+    transcription without them. Results share the on-disk transcription cache,
+    under their own engine key.
+    """
+    try:
+        import torch
+        import librosa
+        from transformers import pipeline
+    except ImportError as e:
+        print(f"Batch mode unavailable ({e}), transcribing sequentially", file=sys.stderr)
+        return [transcribe_one(audio_file) for audio_file in audio_files]
+
+    model_id = f"openai/whisper-{MODEL_NAME}"
+    transcriptions = [""] * len(audio_files)
+    cache_paths = [None] * len(audio_files)
+    pending = list(range(len(audio_files)))
+    if get_config().get('stt.cache_transcriptions', True):
+        pending = []
+        for i, audio_file in enumerate(audio_files):
+            cache_paths[i] = transcription_cache_path(audio_file, f"transformers:{model_id}")
+            if os.path.exists(cache_paths[i]):
+                with open(cache_paths[i], 'r', encoding='utf-8') as f:
+                    transcriptions[i] = f.read()
+            else:
+                pending.append(i)
+    if not pending:
+        return transcriptions
+
+    use_cuda = torch.cuda.is_available()
+    asr = pipeline(
+        "automatic-speech-recognition",
+        model=model_id,
+        chunk_length_s=30,
+        batch_size=batch_size,
+        torch_dtype=torch.float16 if use_cuda else torch.float32,
+        device=0 if use_cuda else -1,
+    )
+
+    # Load as 16 kHz mono up front so the pipeline skips its own resampler
+    inputs = [
+        {"raw": librosa.load(audio_files[i], sr=16000, mono=True)[0], "sampling_rate": 16000}
+        for i in pending
+    ]
+    results = asr(inputs, generate_kwargs={"language": "en"})
+    for i, result in zip(pending, results):
+        transcriptions[i] = result["text"].strip()
+        if cache_paths[i] and transcriptions[i]:
+            store_cached_transcription(cache_paths[i], transcriptions[i])
+    return transcriptions
+
+
+def _stdin_loop():
+    """Transcribe each filename read from stdin, one output line per input"""
+    for line in sys.stdin:
+        audio_file = line.strip()
+        if not audio_file:
+            continue
+        if not os.path.exists(audio_file):
+            print(f"Error: File '{audio_file}' not found", file=sys.stderr)
+            print(flush=True)
+            continue
+        print(transcribe_one(audio_file) or "", flush=True)
 
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python force_transcribe.py <audio_file>", file=sys.stderr)
+    parser = argparse.ArgumentParser(
+        description="Transcribe WAV files and print only the transcribed text"
+    )
+    parser.add_argument("audio_files", nargs="*", help="WAV file(s) to transcribe")
+    parser.add_argument("--stdin-loop", action="store_true",
+                        help="Read filenames from stdin and keep the model loaded between them")
+    parser.add_argument("--batch", action="store_true",
+                        help="Transcribe all files in batched forward passes (transformers pipeline, same model size)")
+    parser.add_argument("--batch-size", type=int, default=16,
+                        help="Files per forward pass in --batch mode (default: 16)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes for multiple files (each loads its own model)")
+    args = parser.parse_args()
+
+    if not args.audio_files and not args.stdin_loop:
+        print("Usage: python audio_file_transcribe.py <audio_file> [<audio_file> ...]", file=sys.stderr)
         print("Supported formats: WAV files", file=sys.stderr)
         sys.exit(1)
-    
-    audio_file = sys.argv[1]
-    
-    # Check if file exists
-    if not os.path.exists(audio_file):
-        print(f"Error: File '{audio_file}' not found", file=sys.stderr)
-        sys.exit(1)
-    
-    # Initialize STT with Whisper (more accurate for file transcription)
-    try:
-        stt = JarvisSTT(stt_engine="whisper", model_name="base")
-    except Exception as e:
-        print(f"Error initializing STT engine: {e}", file=sys.stderr)
-        sys.exit(1)
-    
-    # Transcribe the file
+
+    # Check if files exist
+    for audio_file in args.audio_files:
+        if not os.path.exists(audio_file):
+            print(f"Error: File '{audio_file}' not found", file=sys.stderr)
+            sys.exit(1)
+
+    # Transcribe the files
     try:
-        transcription = stt.transcribe_file(audio_file)
-        
-        # Only print the transcribed text (no additional output)
-        if transcription:
-            print(transcription)
+        if args.batch and len(args.audio_files) > 1:
+            transcriptions = transcribe_files(args.audio_files, args.batch_size)
+        elif args.jobs > 1 and len(args.audio_files) > 1:
+            workers = min(args.jobs, len(args.audio_files))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_stt) as pool:
+                transcriptions = list(pool.map(transcribe_one, args.audio_files))
         else:
-            # If no transcription, exit silently (no output)
-            pass
-            
+            try:
+                _init_stt()
+            except Exception as e:
+                print(f"Error initializing STT engine: {e}", file=sys.stderr)
+                sys.exit(1)
+            transcriptions = [transcribe_one(audio_file) for audio_file in args.audio_files]
+
+        if len(transcriptions) == 1:
+            # Only print the transcribed text (no additional output)
+            if transcriptions[0]:
+                print(transcriptions[0])
+        else:
+            # One line per input, in order, so output stays aligned with the inputs
+            for transcription in transcriptions:
+                print(transcription or "")
+
+        if args.stdin_loop:
+            _stdin_loop()
+
     except Exception as e:
         print(f"Error transcribing file: {e}", file=sys.stderr)
         sys.exit(1)
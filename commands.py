@@ -6,16 +6,42 @@ Centralized command processing for the Jarvis voice assistant.
 Contains all voice commands, their patterns, and handler functions.
 """
 
-import datetime
 import random
+import itertools
 import logging
-import subprocess
-import platform
 import os
-from typing import Dict, List, Callable, Optional, Any
+import re
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from time import time, localtime, gmtime, strftime
+from typing import Dict, List, Callable, Optional, Any, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
+# "-InternalBattery-0 (id=...)	85%; discharging; ..." -> (b"85", b"discharging")
+_BATT_RE = re.compile(rb'InternalBattery[^\n]*?(\d+)%;\s*(\w+)')
+
+# Punctuation Whisper likes to add ("Jarvis, what time is it?"); apostrophes are kept
+_PUNCT_TABLE = str.maketrans('', '', ",.?!;:")
+
+
+@functools.lru_cache(maxsize=4)
+def _fmt_time(minute_epoch: int) -> str:
+    """Clock time for an epoch minute, formatted once per minute"""
+    return strftime("%I:%M %p", localtime(minute_epoch * 60))
+
+
+@functools.lru_cache(maxsize=4)
+def _fmt_date(local_day: int) -> str:
+    """Date for a local day number (days since the epoch, local time), formatted once per day"""
+    return strftime("%A, %B %d, %Y", gmtime(local_day * 86400))
+
+
 class JarvisCommands:
     """Centralized command processing for Jarvis voice assistant"""
     
@@ -89,6 +115,28 @@ class JarvisCommands:
             "capabilities": self.show_help,
         }
         
+        # Deactivation commands - require exact match or very specific phrasing
+        self.deactivation_commands = {
+            "stop listening": self.stop_listening,
+            "go to sleep": self.stop_listening, 
+            "shutdown": self.shutdown,
+            "shutdown jarvis": self.shutdown,
+            "goodbye": self.goodbye,
+            "goodbye jarvis": self.goodbye
+        }
+        
+        # Single TTS worker: speech plays in submission order while commands return immediately
+        self._tts_exec = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jarvis-speech")
+        self._last_speech = None
+        
+        # Operating system name, resolved on first use by the system info handlers
+        self._platform = None
+        
+        # Pattern matcher, rebuilt lazily whenever the command set changes
+        self._automaton = None
+        self._dispatch = None
+        self._matcher_dirty = True
+        
         # Response templates
         self.responses = {
             "acknowledgments": [
@@ -117,112 +165,211 @@ class JarvisCommands:
                 "Goodbye, sir. I'll be here when you need me.",
                 "Farewell, sir. Have a wonderful day.",
                 "Good day, sir. Until we speak again."
+            ],
+            "status": [
+                "All systems are functioning normally, sir. I am ready to assist you.",
+                "Systems operational, sir. How may I help you?",
+                "Everything is running smoothly, sir. What do you need?",
+                "All systems green, sir. Standing by for your commands."
+            ],
+            "tests": [
+                "Test successful. All systems operational, sir.",
+                "Voice recognition and synthesis are working perfectly, sir.",
+                "I hear you loud and clear, sir.",
+                "Systems check complete. Everything is functioning optimally, sir."
+            ],
+            "jokes": [
+                "Why don't scientists trust atoms, sir? Because they make up everything.",
+                "I told my computer a joke about UDP, sir. I don't know if it got it.",
+                "Why do programmers prefer dark mode, sir? Because light attracts bugs.",
+                "What do you call a computer that sings, sir? A Dell.",
+                "Why was the JavaScript developer sad, sir? Because he didn't know how to null his feelings."
             ]
         }
+        
+        # Shuffled round-robin over each response list: no repeats until the list is exhausted
+        self._cycles = {
+            name: itertools.cycle(random.sample(options, len(options)))
+            for name, options in self.responses.items()
+            if isinstance(options, list)
+        }
+        
+        # Greeting for each hour of the day, so greet() is a single index
+        greetings = self.responses["greetings"]
+        self._hour_to_greeting = tuple(
+            greetings["morning" if hour < 12 else "afternoon" if hour < 18 else "evening"]
+            for hour in range(24)
+        )
     
     def process_command(self, text: str) -> bool:
         """Process voice command and execute appropriate action"""
-        text_lower = text.lower().strip()
+        text_lower = text.lower().translate(_PUNCT_TABLE).strip()
         
-        # Deactivation commands - require exact match or very specific phrasing
-        deactivation_commands = {
-            "stop listening": self.stop_listening,
-            "go to sleep": self.stop_listening, 
-            "shutdown": self.shutdown,
-            "shutdown jarvis": self.shutdown,
-            "goodbye": self.goodbye,
-            "goodbye jarvis": self.goodbye
-        }
+        match = self._match_command(text_lower)
+        if match is None:
+            # No command found
+            self.handle_unknown_command(text)
+            return False
         
-        # Check deactivation commands first with exact match
-        for pattern, handler in deactivation_commands.items():
-            if text_lower == pattern or text_lower.endswith(pattern):
-                logger.info(f"🎯 Executing deactivation command: {pattern}")
-                try:
-                    handler(text)
-                    return True
-                except Exception as e:
-                    logger.error(f"Command execution failed: {e}")
-                    self.speak_error()
-                    return True
+        is_deactivation, pattern, handler = match
+        if is_deactivation:
+            logger.info(f"🎯 Executing deactivation command: {pattern}")
+        else:
+            logger.info(f"🎯 Executing command: {pattern}")
+        try:
+            handler(text)
+        except Exception as e:
+            logger.error(f"Command execution failed: {e}")
+            self.speak_error()
+        return True
+    
+    def _build_matcher(self):
+        """Snapshot the command patterns and build the Aho-Corasick automaton over them.
         
-        # Check for other command patterns with substring match
-        for pattern, handler in self.command_patterns.items():
-            if pattern not in deactivation_commands and pattern in text_lower:
-                logger.info(f"🎯 Executing command: {pattern}")
-                try:
-                    handler(text)
-                    return True
-                except Exception as e:
-                    logger.error(f"Command execution failed: {e}")
-                    self.speak_error()
-                    return True
+        Payloads carry a priority so that deactivation commands win first and
+        the remaining patterns keep their dictionary order, matching the
+        behaviour of the plain linear scan.
+        """
+        self._matcher_dirty = False
         
-        # No command found
-        self.handle_unknown_command(text)
-        return False
+        # Tuples of (pattern, handler) pairs for the linear fallback; regular
+        # patterns shadowed by a deactivation command are dropped up front
+        self._deactivation_tuple = tuple(self.deactivation_commands.items())
+        self._patterns_tuple = tuple(
+            (pattern, handler) for pattern, handler in self.command_patterns.items()
+            if pattern not in self.deactivation_commands
+        )
+        
+        if ahocorasick is None:
+            self._automaton = None
+            self._dispatch = self._compile_dispatch()
+            return
+        
+        automaton = ahocorasick.Automaton()
+        priority = 0
+        for pattern, handler in self._deactivation_tuple:
+            automaton.add_word(pattern, (priority, True, pattern, handler))
+            priority += 1
+        for pattern, handler in self._patterns_tuple:
+            automaton.add_word(pattern, (priority, False, pattern, handler))
+            priority += 1
+        automaton.make_automaton()
+        self._automaton = automaton
+    
+    def _compile_dispatch(self) -> Callable[[str], Optional[Tuple[bool, str, Callable[[str], None]]]]:
+        """Generate a straight-line if-chain over the pattern snapshot for the linear fallback.
+        
+        Tests stay in priority order (deactivation first, then dictionary order)
+        so the first hit is the same one the loop over the tuples would return.
+        """
+        lines = ["def _dispatch(t):"]
+        results = []
+        for is_deactivation, pairs in ((True, self._deactivation_tuple), (False, self._patterns_tuple)):
+            for pattern, handler in pairs:
+                test = f"t.endswith({pattern!r})" if is_deactivation else f"{pattern!r} in t"
+                lines.append(f"    if {test}: return _r[{len(results)}]")
+                results.append((is_deactivation, pattern, handler))
+        lines.append("    return None")
+        
+        namespace = {"_r": tuple(results)}
+        exec("\n".join(lines), namespace)
+        return namespace["_dispatch"]
+    
+    def _match_command(self, text_lower: str):
+        """Find the command for the text as (is_deactivation, pattern, handler), or None"""
+        if self._matcher_dirty:
+            self._build_matcher()
+        
+        if self._automaton is not None:
+            # Single pass over the text; deactivation patterns only count at the end
+            last_index = len(text_lower) - 1
+            best = None
+            for end_index, payload in self._automaton.iter(text_lower):
+                if payload[1] and end_index != last_index:
+                    continue
+                if best is None or payload[0] < best[0]:
+                    best = payload
+            return best[1:] if best else None
+        
+        # Fallback: generated linear scan when pyahocorasick is not installed
+        return self._dispatch(text_lower)
     
     def speak(self, text: str):
-        """Convenience method to speak text"""
-        if self.assistant and hasattr(self.assistant, 'speak_without_feedback'):
-            self.assistant.speak_without_feedback(text)
-        else:
-            self.tts.speak_direct(text)
+        """Convenience method to speak text (queued on the TTS worker, returns immediately)"""
+        self._last_speech = self._tts_exec.submit(self._speak_now, text)
+        if getattr(self.assistant, 'prevent_feedback', False):
+            # Feedback prevention pauses the mic while speaking: don't hand control
+            # back to the listener until it has resumed
+            self.wait_for_speech()
+    
+    def _speak_now(self, text: str):
+        """Speak text on the TTS worker thread"""
+        try:
+            if self.assistant and hasattr(self.assistant, 'speak_without_feedback'):
+                self.assistant.speak_without_feedback(text)
+            else:
+                self.tts.speak_direct(text)
+        except Exception as e:
+            logger.error(f"Speech failed: {e}")
     
-    def speak_random(self, response_list: List[str]):
-        """Speak a random response from list"""
-        self.speak(random.choice(response_list))
+    def wait_for_speech(self, timeout: Optional[float] = None):
+        """Block until everything queued so far has been spoken"""
+        if self._last_speech is not None:
+            self._last_speech.result(timeout=timeout)
+    
+    def speak_random(self, response_key: str):
+        """Speak the next response from a shuffled response list"""
+        self.speak(next(self._cycles[response_key]))
     
     def speak_error(self):
         """Speak a random error message"""
-        self.speak_random(self.responses["errors"])
+        self.speak_random("errors")
+    
+    def _system(self) -> str:
+        """Operating system name, looked up once (platform is imported lazily)"""
+        if self._platform is None:
+            import platform
+            self._platform = platform.system()
+        return self._platform
+    
+    @staticmethod
+    def _read_command_lines(cmd: List[str], count: int) -> List[bytes]:
+        """Run a command and return only its first `count` stdout lines, stopping it early"""
+        import subprocess
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, close_fds=True)
+        try:
+            return [proc.stdout.readline() for _ in range(count)]
+        finally:
+            proc.stdout.close()
+            proc.terminate()
+            proc.wait()
     
     # ==================== COMMAND HANDLERS ====================
     
     def tell_time(self, text: str):
         """Tell current time"""
-        current_time = datetime.datetime.now().strftime("%I:%M %p")
+        current_time = _fmt_time(int(time() // 60))
         response = f"The current time is {current_time}, sir."
         self.speak(response)
     
     def tell_date(self, text: str):
         """Tell current date"""
-        current_date = datetime.datetime.now().strftime("%A, %B %d, %Y")
+        now = time()
+        current_date = _fmt_date(int((now + localtime(now).tm_gmtoff) // 86400))
         response = f"Today is {current_date}, sir."
         self.speak(response)
     
     def greet(self, text: str):
         """Handle greetings with time-appropriate responses"""
-        current_hour = datetime.datetime.now().hour
-        
-        if current_hour < 12:
-            response = self.responses["greetings"]["morning"]
-        elif current_hour < 18:
-            response = self.responses["greetings"]["afternoon"]
-        else:
-            response = self.responses["greetings"]["evening"]
-        
-        self.speak(response)
+        self.speak(self._hour_to_greeting[localtime().tm_hour])
     
     def status_check(self, text: str):
         """System status check"""
-        responses = [
-            "All systems are functioning normally, sir. I am ready to assist you.",
-            "Systems operational, sir. How may I help you?",
-            "Everything is running smoothly, sir. What do you need?",
-            "All systems green, sir. Standing by for your commands."
-        ]
-        self.speak_random(responses)
+        self.speak_random("status")
     
     def test_response(self, text: str):
         """Test voice and system response"""
-        responses = [
-            "Test successful. All systems operational, sir.",
-            "Voice recognition and synthesis are working perfectly, sir.",
-            "I hear you loud and clear, sir.",
-            "Systems check complete. Everything is functioning optimally, sir."
-        ]
-        self.speak_random(responses)
+        self.speak_random("tests")
     
     def introduce(self, text: str):
         """Introduce Jarvis"""
@@ -237,22 +384,21 @@ class JarvisCommands:
     def battery_status(self, text: str):
         """Check battery status (macOS)"""
         try:
-            if platform.system() == "Darwin":
-                result = subprocess.run(["pmset", "-g", "batt"], capture_output=True, text=True)
-                if "InternalBattery" in result.stdout:
-                    # Parse battery percentage
-                    lines = result.stdout.split('\n')
-                    for line in lines:
-                        if "InternalBattery" in line and "%" in line:
-                            percentage = line.split('%')[0].split()[-1]
-                            if "charging" in line.lower():
-                                status = "and charging"
-                            elif "charged" in line.lower():
-                                status = "and fully charged"
-                            else:
-                                status = "on battery power"
-                            response = f"Battery is at {percentage} percent {status}, sir."
-                            break
+            if self._system() == "Darwin":
+                import subprocess
+                result = subprocess.run(["pmset", "-g", "batt"], capture_output=True)
+                if b"InternalBattery" in result.stdout:
+                    # Parse battery percentage and state in one regex pass over the raw bytes
+                    match = _BATT_RE.search(result.stdout)
+                    if match:
+                        state = match.group(2)
+                        if state == b"charging":
+                            status = "and charging"
+                        elif state == b"charged":
+                            status = "and fully charged"
+                        else:
+                            status = "on battery power"
+                        response = f"Battery is at {match.group(1).decode()} percent {status}, sir."
                     else:
                         response = "Unable to determine battery status, sir."
                 else:
@@ -267,9 +413,22 @@ class JarvisCommands:
     def memory_usage(self, text: str):
         """Check memory usage"""
         try:
-            if platform.system() == "Darwin":
-                result = subprocess.run(["vm_stat"], capture_output=True, text=True)
-                response = "Memory statistics retrieved, sir. System memory appears to be functioning normally."
+            if self._system() == "Darwin":
+                # Header plus the free/active/inactive/speculative/throttled/wired lines
+                lines = self._read_command_lines(["vm_stat"], 7)
+                pages = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(b":")
+                    if value.strip():
+                        pages[name.strip()] = int(value.strip().rstrip(b"."))
+                
+                used = pages.get(b"Pages active", 0) + pages.get(b"Pages wired down", 0)
+                total = used + sum(pages.get(name, 0) for name in
+                                   (b"Pages free", b"Pages inactive", b"Pages speculative"))
+                if total:
+                    response = f"Memory is {round(100 * used / total)} percent in use, sir."
+                else:
+                    response = "Memory statistics retrieved, sir. System memory appears to be functioning normally."
             else:
                 response = "Memory monitoring details are not available on this system, sir."
         except Exception:
@@ -280,13 +439,13 @@ class JarvisCommands:
     def disk_usage(self, text: str):
         """Check disk usage"""
         try:
-            if platform.system() == "Darwin":
-                result = subprocess.run(["df", "-h", "/"], capture_output=True, text=True)
-                lines = result.stdout.strip().split('\n')
-                if len(lines) > 1:
+            if self._system() == "Darwin":
+                # Header line, then the line for /
+                lines = self._read_command_lines(["df", "-h", "/"], 2)
+                if lines[1].strip():
                     parts = lines[1].split()
                     if len(parts) >= 5:
-                        used_percent = parts[4]
+                        used_percent = parts[4].decode()
                         response = f"Main disk is {used_percent} full, sir."
                     else:
                         response = "Disk usage information retrieved, sir."
@@ -301,14 +460,7 @@ class JarvisCommands:
     
     def tell_joke(self, text: str):
         """Tell a joke"""
-        jokes = [
-            "Why don't scientists trust atoms, sir? Because they make up everything.",
-            "I told my computer a joke about UDP, sir. I don't know if it got it.",
-            "Why do programmers prefer dark mode, sir? Because light attracts bugs.",
-            "What do you call a computer that sings, sir? A Dell.",
-            "Why was the JavaScript developer sad, sir? Because he didn't know how to null his feelings."
-        ]
-        self.speak_random(jokes)
+        self.speak_random("jokes")
     
     def set_reminder(self, text: str):
         """Set a reminder (placeholder)"""
@@ -342,10 +494,14 @@ class JarvisCommands:
         if self.assistant:
             self.assistant.is_listening = False
             self.assistant.is_active = False
+            if hasattr(self.assistant, 'stop_event'):
+                # Say the farewell before waking the shutdown
+                self.wait_for_speech()
+                self.assistant.stop_event.set()
     
     def goodbye(self, text: str):
         """Handle goodbye"""
-        self.speak_random(self.responses["farewells"])
+        self.speak_random("farewells")
         if self.assistant:
             self.assistant.is_active = False
     
@@ -362,12 +518,14 @@ class JarvisCommands:
     def add_custom_command(self, pattern: str, handler: Callable[[str], None]):
         """Add a custom command pattern and handler"""
         self.command_patterns[pattern] = handler
+        self._matcher_dirty = True
         logger.info(f"Added custom command: {pattern}")
     
     def remove_command(self, pattern: str) -> bool:
         """Remove a command pattern"""
         if pattern in self.command_patterns:
             del self.command_patterns[pattern]
+            self._matcher_dirty = True
             logger.info(f"Removed command: {pattern}")
             return True
         return False
@@ -4,16 +4,40 @@ Config Manager - Centralized configuration management for Jarvis
 """
 
 import json
+import mmap
 import os
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _parse_json(buffer) -> Any:
+    """Parse JSON straight from a bytes-like buffer (orjson, then ujson, then stdlib json)"""
+    if orjson is not None:
+        with memoryview(buffer) as view:
+            return orjson.loads(view)
+    if ujson is not None:
+        return ujson.loads(buffer[:])
+    return json.loads(buffer[:])
+
 
 class ConfigManager:
     """Singleton configuration manager for Jarvis project"""
     
     _instance = None
     _config = None
+    _flat = {}
+    _loaded_path = None
+    _loaded_mtime = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -25,19 +49,44 @@ class ConfigManager:
             self.load_config()
     
     def load_config(self, config_path: Optional[str] = None):
-        """Load configuration from JSON file"""
+        """Load configuration from JSON file, skipping the parse if the file is unchanged"""
         if config_path is None:
             # Look for config.json in the project root
             project_root = Path(__file__).parent
             config_path = project_root / "config.json"
         
         try:
-            with open(config_path, 'r') as f:
-                self._config = json.load(f)
+            mtime = os.stat(config_path).st_mtime_ns
+            if (self._config is not None and str(config_path) == self._loaded_path
+                    and mtime == self._loaded_mtime):
+                return
+            
+            # Map the file and parse from the page cache without an intermediate copy
+            with open(config_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    self._config = _parse_json(mm)
         except FileNotFoundError:
             raise FileNotFoundError(f"Config file not found: {config_path}")
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             raise ValueError(f"Invalid JSON in config file: {e}")
+        
+        self._loaded_path = str(config_path)
+        self._loaded_mtime = mtime
+        self._rebuild_flat()
+    
+    def _rebuild_flat(self):
+        """Index every config node by its dotted path so get() is a single lookup"""
+        flat = {}
+        
+        def walk(node: Dict[str, Any], prefix: str):
+            for key, value in node.items():
+                path = f"{prefix}{key}"
+                flat[path] = value
+                if isinstance(value, dict):
+                    walk(value, f"{path}.")
+        
+        walk(self._config, "")
+        self._flat = flat
     
     def get(self, key_path: str, default: Any = None) -> Any:
         """
@@ -53,15 +102,7 @@ class ConfigManager:
         if self._config is None:
             self.load_config()
         
-        keys = key_path.split('.')
-        value = self._config
-        
-        try:
-            for key in keys:
-                value = value[key]
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._flat.get(key_path, default)
     
     def get_audio_config(self, performance_mode: str = None) -> Dict[str, Any]:
         """Get audio configuration section with optional performance mode"""
@@ -113,6 +154,10 @@ class ConfigManager:
         
         # Set the final value
         current[keys[-1]] = value
+        self._rebuild_flat()
+        
+        # In-memory config now differs from disk; a later load_config() must re-read
+        self._loaded_mtime = None
     
     def save_config(self, config_path: Optional[str] = None):
         """Save current configuration back to file"""
@@ -120,8 +165,17 @@ class ConfigManager:
             project_root = Path(__file__).parent
             config_path = project_root / "config.json"
         
-        with open(config_path, 'w') as f:
-            json.dump(self._config, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(self._config, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(self._config, indent=2).encode('utf-8')
+        
+        with open(config_path, 'wb') as f:
+            f.write(data)
+        
+        # The file now matches memory, so don't let our own write invalidate the cache
+        if str(config_path) == self._loaded_path:
+            self._loaded_mtime = os.stat(config_path).st_mtime_ns
 
 
 # Convenience function for getting config instance
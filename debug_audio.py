@@ -3,10 +3,28 @@
 Debug Audio Script - Diagnose speech detection issues
 """
 
+import math
 import time
 import numpy as np
 from speech_analysis.stt import JarvisSTT, AudioBuffer, AudioConfig
 
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+
+def is_voiced(vad, audio_chunk: np.ndarray, sample_rate: int) -> bool:
+    """True if any 20 ms frame of the chunk is speech (always True without a VAD)"""
+    if vad is None:
+        return True
+    frame_len = sample_rate // 50
+    for start in range(0, len(audio_chunk) - frame_len + 1, frame_len):
+        if vad.is_speech(audio_chunk[start:start + frame_len].tobytes(), sample_rate):
+            return True
+    return False
+
+
 def debug_audio_levels():
     """Debug audio levels and speech detection"""
     print("🔍 Audio Debug Mode")
@@ -31,6 +49,13 @@ def debug_audio_levels():
     # Create temporary audio buffer with debug enabled
     temp_buffer = AudioBuffer(debug=True)
     
+    # Cheap WebRTC VAD in front of the buffer: silence before an utterance is never buffered
+    vad = webrtcvad.Vad(2) if webrtcvad else None
+    if vad is None:
+        print("ℹ️  webrtcvad not installed - every chunk goes to the speech detector")
+    voiced_chunks = 0
+    utterance_chunks = 0
+    
     try:
         # Open audio stream
         stream = stt.audio.open(
@@ -45,32 +70,48 @@ def debug_audio_levels():
         start_time = time.time()
         chunk_count = 0
         
+        # Bind hot-loop callables once; stream.read blocks for a full chunk already
+        read = stream.read
+        frombuffer = np.frombuffer
+        add_chunk = temp_buffer.add_chunk
+        chunk_size = config.chunk_size
+        
         while time.time() - start_time < 30:
             try:
                 # Read audio chunk
-                data = stream.read(config.chunk_size, exception_on_overflow=False)
-                audio_chunk = np.frombuffer(data, dtype=np.int16)
+                data = read(chunk_size, exception_on_overflow=False)
+                audio_chunk = frombuffer(data, dtype=np.int16)
                 chunk_count += 1
                 
-                # Calculate RMS for this chunk
-                if len(audio_chunk) > 0:
-                    rms = np.sqrt(np.mean(audio_chunk.astype(np.float64) ** 2))
+                # Check with buffer; once speech started every chunk is needed for silence detection
+                voiced = is_voiced(vad, audio_chunk, config.sample_rate)
+                if voiced or temp_buffer.speech_detected:
+                    utterance_complete = add_chunk(audio_chunk, config)
+                    if temp_buffer.speech_detected or utterance_complete:
+                        utterance_chunks += 1
+                        voiced_chunks += voiced
                 else:
-                    rms = 0.0
-                
-                # Check with buffer
-                utterance_complete = temp_buffer.add_chunk(audio_chunk, config)
+                    utterance_complete = False
                 
                 # Print status every 10 chunks (roughly every 0.6 seconds)
                 if chunk_count % 10 == 0:
+                    # Calculate RMS for this chunk
+                    # (dot product avoids a squared temporary; int64 since int32 would overflow)
+                    samples = audio_chunk.astype(np.int64)
+                    rms = math.sqrt(samples.dot(samples) / samples.size) if samples.size else 0.0
                     print(f"Chunk {chunk_count:3d}: RMS={rms:6.1f}, Recording={temp_buffer.is_recording}, Speech={temp_buffer.speech_detected}, Silence={temp_buffer.silence_counter}")
                 
                 if utterance_complete:
                     audio_data = temp_buffer.get_audio_data()
                     print(f"\n🎉 UTTERANCE COMPLETE! Audio data length: {len(audio_data)}")
                     
+                    voiced_ratio = voiced_chunks / utterance_chunks if utterance_chunks else 0.0
+                    voiced_chunks = utterance_chunks = 0
+                    
                     # Try transcription
-                    if len(audio_data) > 0:
+                    if vad is not None and voiced_ratio < 0.1:
+                        print(f"⏭️  Skipping transcription - only {voiced_ratio:.0%} of the utterance was voiced")
+                    elif len(audio_data) > 0:
                         print("🔄 Transcribing...")
                         transcription = stt.stt_engine.transcribe(audio_data, config)
                         print(f"📝 Result: '{transcription}'")
@@ -79,8 +120,6 @@ def debug_audio_levels():
             except Exception as e:
                 print(f"Error reading audio: {e}")
                 continue
-                
-            time.sleep(0.01)  # Small delay
         
         # Clean up
         stream.stop_stream()
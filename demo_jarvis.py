@@ -30,7 +30,7 @@ def demo_voice_responses():
         print(f"\n🎯 Testing: {description}")
         time.sleep(1)
         action()
-        time.sleep(2)  # Wait for speech to complete
+        assistant.commands.wait_for_speech()
     
     print("\n✨ TTS Demo completed!")
 
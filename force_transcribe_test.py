@@ -1,58 +1,158 @@
 #!/usr/bin/env python3
 
+import sys
 import time
 import datetime
 import threading
+import queue
 import logging
+import logging.handlers
 import numpy as np
-from speech_analysis.stt import JarvisSTT, AudioConfig
 
-class LiveTranscriber:
-    def __init__(self, chunk_duration=3.0, log_file='stt_transcription_log.txt'):
-        self.jarvis = JarvisSTT()
-        self.chunk_duration = chunk_duration  # seconds to record before transcribing
-        self.running = False
-        self.transcription_count = 0
-        self.wake_word_count = 0
-        self.start_time = None
-        self.log_file = log_file
-        
-        # Set up logging to file and console
-        self.logger = logging.getLogger('live_transcriber')
-        self.logger.setLevel(logging.INFO)
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+# Records never use thread/process names, so skip collecting them
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+_FORMATTER = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_file_buffers = {}  # log file -> buffered file handler of the live_transcriber logger
+
+
+def _get_logger(log_file):
+    """The live transcriber logger, with its handlers attached once per log file"""
+    logger = logging.getLogger('live_transcriber')
+    if log_file not in _file_buffers:
+        logger.setLevel(logging.INFO)
+        logger.propagate = False  # the console handler below already prints everything
         
         # Clear any existing handlers
-        self.logger.handlers.clear()
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers.clear()
+        _file_buffers.clear()
         
         # File handler
         file_handler = logging.FileHandler(log_file, mode='a')
         file_handler.setLevel(logging.INFO)
+        file_handler.setFormatter(_FORMATTER)
         
-        # Console handler  
+        # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(_FORMATTER)
         
-        # Formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
+        # Buffer file writes: flushed every 64 records, on warnings (wake words) and on stop
+        file_buffer = logging.handlers.MemoryHandler(
+            capacity=64, flushLevel=logging.WARNING, target=file_handler
+        )
         
         # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        logger.addHandler(file_buffer)
+        logger.addHandler(console_handler)
+        _file_buffers[log_file] = file_buffer
+    return logger, _file_buffers[log_file]
+
+
+class LiveTranscriber:
+    def __init__(self, chunk_duration=3.0, log_file='stt_transcription_log.txt'):
+        # Deferred so importing this module doesn't load the audio/model stack
+        from speech_analysis.stt import JarvisSTT, AudioBuffer
+        
+        self.jarvis = JarvisSTT()
+        # Own 30 s rolling buffer, fed straight from the microphone: JarvisSTT's utterance
+        # detection (which empties its buffer on every pause) never sees this audio
+        self.audio_buffer = AudioBuffer(max_size=30 * self.jarvis.config.sample_rate)
+        self.chunk_duration = chunk_duration  # legacy fixed chunk length; the streaming loop uses min_chunk
+        self.min_chunk = 1.0  # seconds between streaming updates
+        self.confirmed_text = ""  # text committed so far (agreed on by two updates)
+        self.prev_hypothesis = []  # words of the previous update's transcription
+        self.hypothesis_start = None  # stream position prev_hypothesis was decoded from
+        self.vad = webrtcvad.Vad(2) if webrtcvad else None  # skips Whisper on silence
+        self.min_voiced_ratio = 0.2
+        self.peak_threshold = None  # int16 peak below which audio is silence; set from the first second
+        
+        # Reused float32 input for the Whisper engines (the buffer never holds more than max_size samples)
+        self.scratch_f32 = np.empty(self.audio_buffer.max_size, dtype=np.float32)
+        
+        # Recording -> decode worker -> result worker, so decoding overlaps recording
+        self.decode_q = queue.Queue(maxsize=4)  # (start position, end position, audio) snapshots
+        self.result_q = queue.Queue()  # (start position, end position, [(word, end seconds)])
+        # Committing state is owned by the result worker; the others only read committed_position
+        self.committed_position = 0  # stream position up to which audio has been committed and dropped
+        self.committed_words = 0  # words of prev_hypothesis already emitted
+        self.running = False
+        self.stop_event = threading.Event()  # Set by stop() to end the waits immediately
+        self.transcription_count = 0
+        self.wake_word_count = 0
+        self.start_time = None
+        self.log_file = log_file
         
+        # Set up logging to file and console (handlers are shared across instances)
+        self.logger, self.file_buffer = _get_logger(log_file)
+        self.console_output = sys.stdout.isatty()
+        
+    def voiced_ratio(self, audio_data):
+        """Fraction of 30 ms frames the VAD classifies as speech"""
+        sample_rate = self.jarvis.config.sample_rate
+        frame_len = sample_rate * 30 // 1000
+        frames = audio_data.astype(np.int16)
+        total = len(frames) // frame_len
+        if total == 0:
+            return 0.0
+        speech = sum(
+            self.vad.is_speech(frames[i * frame_len:(i + 1) * frame_len].tobytes(), sample_rate)
+            for i in range(total)
+        )
+        return speech / total
+    
+    def calibrate_silence(self, audio_data):
+        """Set the silence peak threshold from the noise floor of the first second of audio"""
+        first_second = audio_data[:self.jarvis.config.sample_rate]
+        noise_peak = max(int(first_second.max()), -int(first_second.min()))
+        # Never above the default of 500, in case someone was already talking
+        self.peak_threshold = min(500, max(100, int(noise_peak * 1.5)))
+        self.logger.info("Silence peak threshold: %d (noise peak %d)", self.peak_threshold, noise_peak)
+    
     def transcribe_chunk(self, audio_data):
         """Transcribe a chunk of audio data"""
+        return " ".join(word for word, _ in self.transcribe_words(audio_data))
+    
+    def transcribe_words(self, audio_data):
+        """Transcribe a chunk as (word, end seconds) pairs; the end is None if the engine has no word timestamps"""
         if len(audio_data) == 0:
-            return ""
+            return []
+        
+        # Peak gate: two vectorized reductions reject pure silence before the VAD
+        # (max/min rather than abs, which would overflow on -32768)
+        if self.peak_threshold is None:
+            self.calibrate_silence(audio_data)
+        peak = max(int(audio_data.max()), -int(audio_data.min()))
+        if peak < self.peak_threshold:
+            return []
+        
+        # Mostly silence: not worth a Whisper forward pass
+        if self.vad is not None and self.voiced_ratio(audio_data) < self.min_voiced_ratio:
+            return []
             
         try:
-            # Transcribe using Whisper
-            transcription = self.jarvis.stt_engine.transcribe(audio_data, self.jarvis.config)
-            return transcription.strip()
+            if self.jarvis.float_input:
+                # Normalize into the scratch buffer instead of a fresh float32 array
+                n = len(audio_data)
+                audio_data = np.multiply(audio_data, np.float32(1 / 32768.0), out=self.scratch_f32[:n])
+            
+            # Transcribe using Whisper, with word timestamps where the engine has them
+            engine = self.jarvis.stt_engine
+            if hasattr(engine, 'transcribe_words'):
+                return [(word, end) for word, end in engine.transcribe_words(audio_data, self.jarvis.config) if word]
+            return [(word, None) for word in engine.transcribe(audio_data, self.jarvis.config).split()]
         except Exception as e:
             print(f"❌ Transcription error: {e}")
-            return ""
+            return []
     
     def process_transcription(self, text):
         """Process and display transcription results"""
@@ -60,66 +160,137 @@ class LiveTranscriber:
             return
             
         self.transcription_count += 1
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
+        timestamp = time.strftime('%H:%M:%S')
         
         # Log transcription to file and display
-        transcription_msg = f"TRANSCRIPTION #{self.transcription_count}: '{text}'"
-        self.logger.info(transcription_msg)
+        self.logger.info("TRANSCRIPTION #%d: '%s'", self.transcription_count, text)
         
-        # Display transcription
-        print(f"\n🎤 [{timestamp}] #{self.transcription_count}: '{text}'")
+        # Display transcription (one write per result; the log already covers non-TTY runs)
+        msg_lines = [f"\n🎤 [{timestamp}] #{self.transcription_count}: '{text}'"]
         
         # Check for wake word
         if self.jarvis.wake_detector.detect(text):
             self.wake_word_count += 1
-            wake_msg = f"WAKE WORD DETECTED! (#{self.wake_word_count}) in: '{text}'"
-            self.logger.warning(wake_msg)
-            print(f"   🚨 WAKE WORD DETECTED! (#{self.wake_word_count})")
-        
-        # Show and log word count
-        word_count = len(text.split())
-        word_count_msg = f"Word count: {word_count} words"
-        self.logger.info(word_count_msg)
-        print(f"   📊 {word_count} words")
+            self.logger.warning("WAKE WORD DETECTED! (#%d) in: '%s'", self.wake_word_count, text)
+            msg_lines.append(f"   🚨 WAKE WORD DETECTED! (#{self.wake_word_count})")
+        
+        # Show and log word count (committed text is single-space joined words)
+        word_count = text.count(" ") + 1
+        self.logger.info("Word count: %d words", word_count)
+        msg_lines.append(f"   📊 {word_count} words")
+        
+        if self.console_output:
+            sys.stdout.write("\n".join(msg_lines) + "\n")
+            sys.stdout.flush()
+    
+    @staticmethod
+    def _agreed_prefix(previous, current):
+        """Number of leading words two hypotheses agree on (LocalAgreement-2)"""
+        count = 0
+        for prev_word, word in zip(previous, current):
+            if prev_word.lower().strip(",.?!") != word.lower().strip(",.?!"):
+                break
+            count += 1
+        return count
     
     def live_transcription_loop(self):
-        """Main live transcription loop"""
-        print(f"🔄 Starting live transcription (chunks of {self.chunk_duration}s)...")
+        """Main live transcription loop: snapshot the buffer every min_chunk seconds"""
+        print(f"🔄 Starting live transcription (updates every {self.min_chunk}s)...")
+        
+        audio_buffer = self.audio_buffer
         
         while self.running:
             try:
-                # Record for the specified duration
-                print(f"\n🎙️  Recording for {self.chunk_duration}s... (Speak now!)")
-                
-                # Clear any existing buffer and start fresh
-                self.jarvis.audio_buffer.buffer.clear()
-                self.jarvis.audio_buffer.is_recording = True
-                
-                # Record for the chunk duration
-                start_record = time.time()
-                while time.time() - start_record < self.chunk_duration and self.running:
-                    time.sleep(0.1)
+                if self.stop_event.wait(timeout=self.min_chunk):
+                    break
                 
-                # Get the recorded audio
-                audio_data = self.jarvis.audio_buffer.get_audio_data()
+                # Recording runs across pauses; the buffer only shrinks when we commit
+                audio_data, end_position = audio_buffer.snapshot()
+                if len(audio_data) <= 100:  # Only transcribe if we have significant audio
+                    continue
                 
-                if len(audio_data) > 100:  # Only transcribe if we have significant audio
-                    print(f"   📊 Processing {len(audio_data)} audio samples...")
-                    transcription = self.transcribe_chunk(audio_data)
-                    self.process_transcription(transcription)
-                else:
-                    print("   🔇 No significant audio detected")
+                # Never block the recorder on a slow decode: drop the oldest snapshot
+                item = (end_position - len(audio_data), end_position, audio_data)
+                while True:
+                    try:
+                        self.decode_q.put(item, block=False)
+                        break
+                    except queue.Full:
+                        try:
+                            self.decode_q.get_nowait()
+                        except queue.Empty:
+                            pass
                     
             except Exception as e:
                 print(f"❌ Error in transcription loop: {e}")
                 time.sleep(1)
     
+    def _decode_worker(self):
+        """Transcribe buffer snapshots while the next one is being recorded"""
+        while self.running:
+            try:
+                start_position, end_position, audio_data = self.decode_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if start_position < self.committed_position:
+                continue  # Snapshot from before the last commit
+            self.result_q.put((start_position, end_position, self.transcribe_words(audio_data)))
+    
+    def _commit_audio(self, position):
+        """Drop the audio before a stream position and start a fresh hypothesis after it"""
+        self.audio_buffer.discard_until(position)
+        self.committed_position = position
+        self.hypothesis_start = position
+        self.prev_hypothesis = []
+        self.committed_words = 0
+    
+    def _result_worker(self):
+        """Commit what two consecutive hypotheses agree on (LocalAgreement-2)"""
+        sample_rate = self.jarvis.config.sample_rate
+        while self.running:
+            try:
+                start_position, end_position, words = self.result_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if start_position < self.committed_position:
+                continue  # Decoded from audio that has since been committed
+            if start_position != self.hypothesis_start:
+                # The window moved (a commit or the 30 s cap trimming the oldest audio):
+                # word indices no longer line up with the previous hypothesis
+                self.prev_hypothesis = []
+                self.committed_words = 0
+                self.hypothesis_start = start_position
+            
+            try:
+                hypothesis = [word for word, _ in words]
+                agreed = self._agreed_prefix(self.prev_hypothesis, hypothesis)
+                if agreed > self.committed_words:
+                    new_text = " ".join(hypothesis[self.committed_words:agreed])
+                    self.confirmed_text = f"{self.confirmed_text} {new_text}".strip()
+                    self.process_transcription(new_text)
+                    self.committed_words = agreed
+                    
+                    last_end = words[agreed - 1][1]
+                    if last_end is not None:
+                        # Drop the audio through the last committed word; the rest is decoded afresh
+                        self._commit_audio(min(start_position + int(last_end * sample_rate), end_position))
+                        continue
+                
+                if self.committed_words == len(hypothesis) == len(self.prev_hypothesis):
+                    # No word timestamps: drop the snapshot once all of it is committed
+                    self._commit_audio(end_position)
+                    continue
+                
+                self.prev_hypothesis = hypothesis
+            except Exception as e:
+                print(f"❌ Error processing transcription: {e}")
+    
     def start(self):
         """Start the live transcription system"""
         print("\n" + "="*60)
         print("🎙️  LIVE TRANSCRIPTION SYSTEM")
         print("="*60)
-        print(f"⏱️  Recording in {self.chunk_duration}s chunks")
+        print(f"⏱️  Streaming updates every {self.min_chunk}s")
         print("🎯 Say 'Jarvis' or 'Hey Jarvis' for wake word detection")
         print("⏹️  Press Ctrl+C to stop")
         print(f"📝 Logging to: {self.log_file}")
@@ -127,17 +298,21 @@ class LiveTranscriber:
         
         self.start_time = datetime.datetime.now()
         self.running = True
+        self.stop_event.clear()
         
         # Log session start
         session_start_msg = f"=== LIVE TRANSCRIPTION SESSION STARTED at {self.start_time.strftime('%Y-%m-%d %H:%M:%S')} ==="
         self.logger.info(session_start_msg)
         
         try:
-            # Start audio listening
-            self.jarvis.start_listening()
+            # Start streaming microphone audio into our buffer
+            self.audio_buffer.clear()
+            self.jarvis.set_audio_sink(self.audio_buffer.append)
             print(f"\n✅ Started at {self.start_time.strftime('%H:%M:%S')}")
             
-            # Run the transcription loop
+            # Decode and commit on worker threads, record on this one
+            threading.Thread(target=self._decode_worker, daemon=True).start()
+            threading.Thread(target=self._result_worker, daemon=True).start()
             self.live_transcription_loop()
             
         except KeyboardInterrupt:
@@ -148,7 +323,8 @@ class LiveTranscriber:
     def stop(self):
         """Stop the live transcription system"""
         self.running = False
-        self.jarvis.stop_listening()
+        self.stop_event.set()
+        self.jarvis.set_audio_sink(None)
         
         if self.start_time:
             end_time = datetime.datetime.now()
@@ -160,6 +336,7 @@ class LiveTranscriber:
             
             session_end_msg = f"=== LIVE TRANSCRIPTION SESSION ENDED at {end_time.strftime('%Y-%m-%d %H:%M:%S')} ==="
             self.logger.info(session_end_msg)
+            self.file_buffer.flush()
             
             print("\n" + "="*60)
             print("📊 LIVE TRANSCRIPTION SUMMARY")
@@ -176,7 +353,7 @@ class LiveTranscriber:
         print("\n✨ Live transcription completed!")
 
 def main():
-    # Create live transcriber with 3-second chunks
+    # Create live transcriber (streaming updates every second)
     transcriber = LiveTranscriber(chunk_duration=3.0)
     
     # Start live transcription
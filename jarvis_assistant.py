@@ -1,27 +1,42 @@
 #!/usr/bin/env python3
 
+import sys
+import argparse
 import time
 import datetime
 import threading
 import logging
-from speech_analysis import JarvisSTT, JarvisTTS
-from commands import JarvisCommands
+from concurrent.futures import TimeoutError as FuturesTimeout
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Transcriptions Whisper tends to produce from silence or noise
+_MEANINGLESS_TRANSCRIPTIONS = frozenset((".", "..", "...", ". .", ". . .", "service.", "I don't know what to do."))
+
 class JarvisAssistant:
     """Complete Jarvis Voice Assistant with STT and TTS"""
     
     def __init__(self, prevent_feedback=False, performance_mode=None):
+        # Imported here so `--help` and argument errors don't pay for the audio/model stack
+        from speech_analysis import JarvisSTT, JarvisTTS
+        from commands import JarvisCommands
+        
         self.performance_mode = performance_mode
-        self.stt = JarvisSTT(stt_engine="whisper", model_name="base", performance_mode=performance_mode)
+        if performance_mode == "fast":
+            # Engine and model come from the fast mode config (faster-whisper, tiny.en)
+            self.stt = JarvisSTT(performance_mode=performance_mode)
+        else:
+            self.stt = JarvisSTT(stt_engine="faster-whisper", model_name="base", performance_mode=performance_mode)
+        if hasattr(self.stt.stt_engine, 'warmup'):
+            self.stt.stt_engine.warmup()
         self.tts = JarvisTTS(tts_engine="system")
         self.is_active = False
         self.is_listening = False
         self.prevent_feedback = prevent_feedback
         self.is_speaking = False  # Track when TTS is active
+        self.stop_event = threading.Event()  # Set to wake start() for shutdown
         
         # Initialize centralized command system
         self.commands = JarvisCommands(self.tts, self)
@@ -30,7 +45,7 @@ class JarvisAssistant:
         self.stt.set_speech_callback(self.on_speech_received)
         # self.stt.set_wake_word_callback(self.on_wake_word_detected)  # Disabled to prevent double greeting
         
-        logger.info(f"Jarvis Assistant initialized with centralized command system, performance mode: {performance_mode or 'default'}")
+        logger.info("Jarvis Assistant initialized with centralized command system, performance mode: %s", performance_mode or 'default')
     
     def on_wake_word_detected(self):
         """Handle wake word detection"""
@@ -40,20 +55,18 @@ class JarvisAssistant:
     
     def on_speech_received(self, text):
         """Handle speech input and wake word detection"""
-        logger.info(f"📝 Speech received: '{text}'")
+        logger.info("📝 Speech received: '%s'", text)
         
         # Filter out empty, very short, or meaningless transcriptions
         text_clean = text.strip()
-        if not text_clean or len(text_clean) < 3 or text_clean in [".", "..", "...", ". .", ". . .", "service.", "I don't know what to do."]:
-            logger.info(f"Ignoring meaningless transcription: '{text_clean}'")
+        if len(text_clean) < 3 or text_clean in _MEANINGLESS_TRANSCRIPTIONS:
+            logger.info("Ignoring meaningless transcription: '%s'", text_clean)
             return
         
         text_lower = text_clean.lower()
-        wake_words = ["jarvis", "hey jarvis"]
         
-        # Check for wake word in the transcribed text
-        contains_wake_word = any(wake_word in text_lower for wake_word in wake_words)
-        is_pure_wake_word = any(text_lower == wake_word for wake_word in wake_words)
+        # Check for wake word in the transcribed text (configured wake words, one pass)
+        contains_wake_word = self.stt.wake_detector.find(text_lower) is not None
         
         # Handle wake word activation
         if contains_wake_word and not self.is_active:
@@ -95,11 +108,12 @@ class JarvisAssistant:
         
         # Start listening
         self.is_listening = True
+        self.stop_event.clear()
         self.stt.start_listening()
         
         try:
-            while self.is_listening:
-                time.sleep(0.5)
+            # Block until stop() or a shutdown command sets the event
+            self.stop_event.wait()
                 
         except KeyboardInterrupt:
             print("\n\n⏹️  Shutting down...")
@@ -130,14 +144,17 @@ class JarvisAssistant:
     def stop(self):
         """Stop the voice assistant"""
         self.is_listening = False
+        self.stop_event.set()
         self.stt.stop_listening()
+        # Let queued responses (the farewell) finish before exiting
+        try:
+            self.commands.wait_for_speech(timeout=10.0)
+        except FuturesTimeout:
+            logger.warning("Stopping with speech still queued")
         print("✨ Jarvis Assistant stopped.")
 
 def main():
     """Main entry point"""
-    import sys
-    import argparse
-    
     parser = argparse.ArgumentParser(description='Jarvis Voice Assistant')
     parser.add_argument('--prevent-feedback', action='store_true', 
                        help='Enable feedback prevention during speech')
@@ -25,6 +25,7 @@ import argparse
 import sys
 import signal
 import time
+import queue
 from speech_analysis.stt import JarvisSTT
 
 class LiveTranscriber:
@@ -35,6 +36,7 @@ class LiveTranscriber:
         self.quiet = quiet
         self.running = False
         self.stt = None
+        self.transcriptions = queue.Queue()  # filled by the STT speech callback
         
         # Set up signal handler for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -47,6 +49,10 @@ class LiveTranscriber:
         self.stop()
         sys.exit(0)
     
+    def _on_speech(self, text):
+        """Speech callback from the STT audio thread: hand the text to the main loop"""
+        self.transcriptions.put(text)
+    
     def start(self):
         """Start the live transcription session."""
         if not self.quiet:
@@ -57,41 +63,36 @@ class LiveTranscriber:
         try:
             # Initialize STT with debug settings
             self.stt = JarvisSTT(stt_engine=self.stt_engine, model_name="tiny.en", debug=self.debug)
+            self.stt.set_speech_callback(self._on_speech)
             self.running = True
             
+            # Keep one microphone stream open for the whole session
+            self.stt.start_listening()
+            
             session_count = 0
             
             while self.running:
-                try:
-                    if not self.quiet:
-                        print(f"🔴 Listening... (session {session_count + 1})")
-                    
-                    # Listen for speech and transcribe
-                    transcription = self.stt.listen_and_transcribe()
+                if not self.quiet:
+                    print(f"🔴 Listening... (session {session_count + 1})")
+                
+                # Wait for the next transcription (timeout only to notice stop())
+                transcription = None
+                while self.running and transcription is None:
+                    try:
+                        transcription = self.transcriptions.get(timeout=0.5)
+                    except queue.Empty:
+                        pass
+                
+                if transcription and transcription.strip():
+                    session_count += 1
+                    timestamp = time.strftime("%H:%M:%S")
                     
-                    if transcription and transcription.strip():
-                        session_count += 1
-                        timestamp = time.strftime("%H:%M:%S")
-                        
-                        if self.quiet:
-                            # Quiet mode: just print the transcription
-                            print(transcription.strip())
-                        else:
-                            # Normal mode: formatted output
-                            print(f"📝 [{timestamp}] You said: {transcription.strip()}")
-                            print("-" * 60)
+                    if self.quiet:
+                        # Quiet mode: just print the transcription
+                        print(transcription.strip())
                     else:
-                        if not self.quiet:
-                            print("🔇 No speech detected or transcription failed.")
-                            print("-" * 60)
-                    
-                    # Small delay to prevent overwhelming the system
-                    time.sleep(0.1)
-                    
-                except Exception as e:
-                    if not self.quiet:
-                        print(f"❌ Error during transcription: {e}")
-                        print("🔄 Continuing...")
+                        # Normal mode: formatted output
+                        print(f"📝 [{timestamp}] You said: {transcription.strip()}")
                         print("-" * 60)
                     
         except KeyboardInterrupt:
@@ -103,6 +104,8 @@ class LiveTranscriber:
     def stop(self):
         """Stop the live transcription."""
         self.running = False
+        if self.stt:
+            self.stt.stop_listening()
 
 
 def main():
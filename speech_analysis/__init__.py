@@ -5,12 +5,13 @@ This module provides speech-to-text and text-to-speech capabilities using Whispe
 pyttsx3, and Coqui TTS engines, along with wake word detection and voice activity detection.
 """
 
-from .stt import JarvisSTT, WhisperSTT, VoskSTT, AudioConfig, AudioBuffer, WakeWordDetector
+from .stt import JarvisSTT, WhisperSTT, FasterWhisperSTT, VoskSTT, AudioConfig, AudioBuffer, WakeWordDetector
 from .tts import JarvisTTS, PyttsxTTS, CoquiTTS, TTSConfig, JarvisPersonality, AudioPlayer
 
 __all__ = [
     'JarvisSTT',
     'WhisperSTT', 
+    'FasterWhisperSTT',
     'VoskSTT',
     'AudioConfig',
     'AudioBuffer',
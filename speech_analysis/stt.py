@@ -5,28 +5,47 @@ This is the foundation for speech-to-text processing with both Whisper and Vosk
 """
 
 import threading
+import queue
 import time
 import numpy as np
 import pyaudio
 import wave
 import io
 import json
-from typing import Optional, Callable, Dict, Any
+import hashlib
+import functools
+import math
+import tempfile
+from typing import Optional, Callable, Dict, Any, List, Tuple
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from collections import deque
 import logging
 import sys
 import os
 
 # Add parent directory to path to import config_manager
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 from config_manager import get_config
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Configure logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# On-disk cache of file transcriptions, keyed by audio fingerprint + engine/model
+TRANSCRIPTION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "jarvis", "stt")
+
+# Audio longer than one 30 s Whisper window (at 16 kHz) goes through faster-whisper's batched pipeline
+BATCHED_MIN_SAMPLES = 30 * 16000
+
 
 @dataclass
 class AudioConfig:
@@ -57,118 +76,389 @@ class AudioConfig:
         self.audio_compression: bool = optimizations.get('audio_compression', False)
 
 
+# Speech probability hysteresis for the frame classifier VADs
+VAD_SPEECH_PROB = 0.5
+VAD_SILENCE_PROB = 0.35
+
+# Utterances with a smaller fraction of speech chunks are noise and never reach the engine
+MIN_SPEECH_RATIO = 0.2
+
+
+# Sample rates each frame classifier accepts; other rates use the RMS energy rule
+VAD_SAMPLE_RATES = {"silero": (8000, 16000), "webrtc": (8000, 16000, 32000, 48000)}
+
+
+@functools.lru_cache(maxsize=1)
+def _silero_loader() -> Optional[Callable]:
+    """silero_vad.load_silero_vad, imported once per process, or None if not installed"""
+    try:
+        from silero_vad import load_silero_vad
+        return load_silero_vad
+    except ImportError:
+        logger.warning("silero-vad not installed, trying webrtcvad")
+        return None
+
+
+def _load_vad(engine: str):
+    """(engine, speech-probability function for int16 chunks): Silero, then webrtcvad, else (None, None)
+    
+    Each call builds its own classifier: Silero carries RNN state from one frame to the
+    next, so a model must not be shared between buffers or threads.
+    """
+    if engine == "silero":
+        load_silero_vad = _silero_loader()
+        try:
+            if load_silero_vad is not None:
+                import torch
+                
+                model = load_silero_vad(onnx=True)
+                
+                def silero_prob(chunk: np.ndarray, sample_rate: int) -> float:
+                    # Silero takes exactly 512 samples at 16 kHz (256 at 8 kHz)
+                    frame_len = 512 if sample_rate == 16000 else 256
+                    frames = len(chunk) // frame_len
+                    if frames == 0:
+                        return 0.0
+                    audio = torch.from_numpy(_to_float32(chunk[:frames * frame_len]))
+                    return max(model(audio[i * frame_len:(i + 1) * frame_len], sample_rate).item()
+                               for i in range(frames))
+                
+                logger.info("Using Silero VAD for speech detection")
+                return "silero", silero_prob
+        except Exception as e:
+            logger.warning(f"Failed to load Silero VAD ({e}), trying webrtcvad")
+        engine = "webrtc"
+    
+    if engine == "webrtc":
+        try:
+            import webrtcvad
+            vad = webrtcvad.Vad(2)
+            
+            def webrtc_prob(chunk: np.ndarray, sample_rate: int) -> float:
+                # Fraction of 30 ms frames classified as speech
+                frame_len = sample_rate * 30 // 1000
+                frames = len(chunk) // frame_len
+                if frames == 0:
+                    return 0.0
+                voiced = sum(vad.is_speech(chunk[i * frame_len:(i + 1) * frame_len].tobytes(), sample_rate)
+                             for i in range(frames))
+                return voiced / frames
+            
+            logger.info("Using WebRTC VAD for speech detection")
+            return "webrtc", webrtc_prob
+        except ImportError:
+            logger.warning("webrtcvad not installed, using RMS energy speech detection")
+    
+    return None, None
+
+
 class AudioBuffer:
-    """Circular buffer for audio data with voice activity detection"""
+    """Bounded FIFO buffer for audio data with voice activity detection"""
 
-    def __init__(self, max_size: int = 32000, debug: bool = False):  # ~2 seconds at 16kHz
-        self.buffer = deque(maxlen=max_size)
+    def __init__(self, max_size: int = 480000, debug: bool = False):  # 30 seconds at 16kHz
+        # Preallocated at twice the cap so appends only compact once per max_size samples
+        self.max_size = max_size
+        self._samples = np.empty(2 * max_size, dtype=np.int16)
+        self._start = 0
+        self._end = 0
+        self._position = 0  # Samples appended since creation: the stream position of _end
+        # The capture callback writes while transcription threads read, compact or discard
+        self._lock = threading.Lock()
         self.is_recording = False
         self.silence_counter = 0
         self.speech_detected = False
         self.recent_rms = deque(maxlen=10)  # Track recent RMS values
+        self._rms_sum = 0.0  # Running sum of recent_rms
+        self._rms_scratch = np.empty(4096, dtype=np.float32)  # Reused float copy of each chunk
         self.background_rms = 0.0
         self.recording_chunks = 0  # Track how long we've been recording
+        self.speech_chunks = 0  # Recorded chunks that were above the speech threshold
+        self.hit_max_length = False  # The utterance was cut off at max_recording_time
         self.debug = debug
+        self._debug_counter = -1
+        # Read once here rather than on every chunk
+        self._rms_log_interval = get_config().get_debug_config().get('rms_logging_interval', 500)
+        
+        # Optional frame classifier for speech detection ("silero" or "webrtc");
+        # the default is the RMS energy rule
+        self.vad_engine, self.vad = _load_vad(get_config().get('optimizations.vad_engine', 'rms'))
+        self.level_name = "Speech prob" if self.vad is not None else "RMS"
         
     def add_chunk(self, chunk: np.ndarray, config: AudioConfig) -> bool:
         """Add audio chunk and detect speech activity"""
-        # Calculate RMS for voice activity detection
-        if len(chunk) == 0:
-            rms = 0.0
-        else:
-            mean_square = np.mean(chunk.astype(np.float64) ** 2)
-            # Handle edge cases: NaN, negative values, or very small values
-            if np.isnan(mean_square) or mean_square < 0:
-                rms = 0.0
-            else:
-                rms = np.sqrt(mean_square)
-        
-        # Smart silence detection optimization - skip processing if obviously silent
-        if config.smart_silence_detection and not self.speech_detected and rms < 10.0:
-            return False  # Skip processing for very quiet chunks
+        if self.vad is not None and config.sample_rate not in VAD_SAMPLE_RATES[self.vad_engine]:
+            logger.warning(f"{self.vad_engine} VAD does not support {config.sample_rate} Hz, using RMS energy speech detection")
+            self.vad_engine = self.vad = None
+            self.level_name = "RMS"
         
-        # Track recent RMS values for adaptive thresholding
-        self.recent_rms.append(rms)
-        
-        # Update background noise estimate when not speaking
-        if not self.speech_detected and len(self.recent_rms) >= 5:
-            self.background_rms = np.mean(self.recent_rms)
-        
-        # Use more reasonable adaptive thresholds
-        if self.background_rms > 0:
-            # Adaptive thresholds based on background noise - but keep silence threshold reasonable
-            speech_threshold = max(config.silence_threshold * 2.0, self.background_rms + 30.0)
-            silence_threshold = min(config.silence_threshold, self.background_rms + 10.0)
+        if self.vad is not None:
+            # Speech probability from the frame classifier, with hysteresis
+            level = self.vad(chunk, config.sample_rate)
+            speech_threshold = VAD_SPEECH_PROB
+            silence_threshold = VAD_SILENCE_PROB
         else:
-            # Initial thresholds when background is not established
-            speech_threshold = config.silence_threshold * 3.0  # Higher threshold for speech
-            silence_threshold = config.silence_threshold * 0.5  # Lower threshold for silence
+            levels = self._energy_levels(chunk, config)
+            if levels is None:
+                return False  # Skip processing for very quiet chunks
+            level, speech_threshold, silence_threshold = levels
         
-        # Debug: Print RMS values occasionally to help tune threshold
-        if hasattr(self, '_debug_counter'):
+        # Debug: Print levels occasionally to help tune threshold
+        if self.debug:
             self._debug_counter += 1
-        else:
-            self._debug_counter = 0
-        
-        # Get debug config for RMS logging interval
-        debug_config = get_config().get_debug_config()
-        rms_logging_interval = debug_config.get('rms_logging_interval', 500)
-            
-        if self.debug and self._debug_counter % rms_logging_interval == 0:
-            logger.info(f"RMS: {rms:.1f}, Speech Threshold: {speech_threshold:.1f}, Silence Threshold: {silence_threshold:.1f}, Background: {self.background_rms:.1f}, Speech: {self.speech_detected}")
+            if self._debug_counter % self._rms_log_interval == 0:
+                logger.info(f"{self.level_name}: {level:.2f}, Speech Threshold: {speech_threshold:.2f}, Silence Threshold: {silence_threshold:.2f}, Background: {self.background_rms:.1f}, Speech: {self.speech_detected}")
         
         # Speech detection: use higher threshold
-        if not self.speech_detected and rms > speech_threshold:
-            if self.debug: logger.info(f"Speech detected - starting recording (RMS: {rms:.1f} > {speech_threshold:.1f})")
+        if not self.speech_detected and level > speech_threshold:
+            if self.debug: logger.info(f"Speech detected - starting recording ({self.level_name}: {level:.2f} > {speech_threshold:.2f})")
             self.speech_detected = True
             self.is_recording = True
             self.silence_counter = 0
             self.recording_chunks = 0
+            self.speech_chunks = 0
+            self.hit_max_length = False
         # Silence detection: use lower threshold, but only if speech was detected
-        elif self.speech_detected and rms <= silence_threshold:
+        elif self.speech_detected and level <= silence_threshold:
             self.silence_counter += 1
             # If silence for configured duration, stop recording
             silence_threshold_chunks = config.silence_duration * config.sample_rate / config.chunk_size
             
             # Debug: Show silence progress occasionally
             if self.debug and self.silence_counter % 3 == 0:  # Every 3 chunks
-                logger.info(f"Silence counting: {self.silence_counter}/{silence_threshold_chunks:.1f} chunks (RMS: {rms:.1f} <= {silence_threshold:.1f})")
+                logger.info(f"Silence counting: {self.silence_counter}/{silence_threshold_chunks:.1f} chunks ({self.level_name}: {level:.2f} <= {silence_threshold:.2f})")
             
             if self.silence_counter > silence_threshold_chunks:
                 logger.info(f"✅ Silence detected - stopping recording (silence for {self.silence_counter} chunks, threshold: {silence_threshold_chunks:.1f})")
                 self.is_recording = False
                 return True  # Signal that we have a complete utterance
         # Continue speech: reset silence counter if above silence threshold but below speech threshold
-        elif self.speech_detected and rms > silence_threshold:
+        elif self.speech_detected and level > silence_threshold:
             self.silence_counter = 0
         
         # Check for maximum recording time (prevent getting stuck)
         if self.is_recording:
             self.recording_chunks += 1
+            if level > speech_threshold:
+                self.speech_chunks += 1
             max_recording_chunks = config.max_recording_time * config.sample_rate / config.chunk_size
             
             if self.recording_chunks > max_recording_chunks:
                 logger.warning(f"Maximum recording time reached ({config.max_recording_time}s) - forcing utterance completion")
                 self.is_recording = False
+                self.hit_max_length = True
                 return True  # Force utterance completion
             
-            self.buffer.extend(chunk)
+            self.append(chunk)
             
         return False
 
-    def get_audio_data(self) -> np.ndarray:
-        """Get the complete audio data and reset buffer"""
-        if not self.buffer:
-            return np.array([])
+    def ingest_bytes(self, in_data: bytes, config: AudioConfig) -> bool:
+        """add_chunk for raw int16 PCM from the audio callback, viewed in place (no copy)"""
+        return self.add_chunk(np.frombuffer(in_data, dtype=np.int16), config)
+
+    def _energy_levels(self, chunk: np.ndarray, config: AudioConfig):
+        """RMS energy of the chunk with adaptive speech/silence thresholds, or None to skip it"""
+        # Calculate RMS for voice activity detection
+        # (float32 BLAS dot product: no squared temporary, twice the SIMD lanes of float64;
+        # plenty of precision for a threshold and a sum of squares can't be NaN)
+        if len(chunk) == 0:
+            rms = 0.0
+        else:
+            n = len(chunk)
+            if len(self._rms_scratch) < n:
+                self._rms_scratch = np.empty(n, dtype=np.float32)
+            samples = self._rms_scratch[:n]
+            np.copyto(samples, chunk)
+            rms = math.sqrt(float(samples.dot(samples)) / n)
+        
+        # Smart silence detection optimization - skip processing if obviously silent
+        if config.smart_silence_detection and not self.speech_detected and rms < 10.0:
+            return None
+        
+        # Track recent RMS values for adaptive thresholding
+        if len(self.recent_rms) == self.recent_rms.maxlen:
+            self._rms_sum -= self.recent_rms[0]
+        self.recent_rms.append(rms)
+        self._rms_sum += rms
+        
+        # Update background noise estimate when not speaking
+        if not self.speech_detected and len(self.recent_rms) >= 5:
+            self.background_rms = self._rms_sum / len(self.recent_rms)
+        
+        # Use more reasonable adaptive thresholds
+        if self.background_rms > 0:
+            # Adaptive thresholds based on background noise - but keep silence threshold reasonable
+            speech_threshold = max(config.silence_threshold * 2.0, self.background_rms + 30.0)
+            silence_threshold = min(config.silence_threshold, self.background_rms + 10.0)
+        else:
+            # Initial thresholds when background is not established
+            speech_threshold = config.silence_threshold * 3.0  # Higher threshold for speech
+            silence_threshold = config.silence_threshold * 0.5  # Lower threshold for silence
         
-        data = np.array(list(self.buffer))
-        self.buffer.clear()
+        return rms, speech_threshold, silence_threshold
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def append(self, chunk: np.ndarray):
+        """Append samples, keeping only the newest max_size of them"""
+        n = len(chunk)
+        with self._lock:
+            self._position += n
+            if n >= self.max_size:
+                self._samples[:self.max_size] = chunk[-self.max_size:]
+                self._start, self._end = 0, self.max_size
+                return
+            
+            if self._end + n > len(self._samples):
+                # Move the samples that survive this append back to the front
+                keep = min(self._end - self._start, self.max_size - n)
+                self._samples[:keep] = self._samples[self._end - keep:self._end]
+                self._start, self._end = 0, keep
+            
+            self._samples[self._end:self._end + n] = chunk
+            self._end += n
+            self._start = max(self._start, self._end - self.max_size)
+
+    def set_max_size(self, max_size: int):
+        """Change the cap (in samples), keeping the newest buffered audio that still fits"""
+        with self._lock:
+            keep = min(self._end - self._start, max_size)
+            samples = np.empty(2 * max_size, dtype=np.int16)
+            samples[:keep] = self._samples[self._end - keep:self._end]
+            self._samples = samples
+            self.max_size = max_size
+            self._start, self._end = 0, keep
+
+    def clear(self):
+        """Drop all buffered audio and any utterance in progress"""
+        with self._lock:
+            self._start = self._end = 0
+        self._reset_utterance()
+
+    def _reset_utterance(self):
+        """Reset per-utterance VAD state; the noise floor (recent_rms, background_rms) carries over"""
         self.speech_detected = False
         self.is_recording = False
         self.silence_counter = 0
         self.recording_chunks = 0
+        self.speech_chunks = 0
+        self.hit_max_length = False
+
+    def peek_audio_data(self) -> np.ndarray:
+        """Get a copy of the buffered audio without resetting the buffer"""
+        return self.snapshot()[0]
+
+    def snapshot(self):
+        """Copy of the buffered audio and the stream position just past its last sample"""
+        with self._lock:
+            return self._samples[self._start:self._end].copy(), self._position
+
+    def discard_until(self, position: int):
+        """Drop buffered samples before a stream position (audio that has already been transcribed)
+        
+        Positions come from snapshot(); samples the FIFO trimmed since then are not dropped twice.
+        """
+        with self._lock:
+            start_position = self._position - (self._end - self._start)
+            self._start += min(max(position - start_position, 0), self._end - self._start)
+
+    def get_audio_data(self, as_float: bool = False) -> np.ndarray:
+        """Get the complete audio data and reset buffer
+        
+        With as_float, samples come back as normalized float32 (Whisper input),
+        converted in the same pass that copies them out.
+        """
+        with self._lock:
+            if self._end == self._start:
+                return np.empty(0, dtype=np.float32 if as_float else np.int16)
+            
+            # Copy out: the audio callback reuses the storage as soon as we reset
+            if as_float:
+                data = np.multiply(self._samples[self._start:self._end], np.float32(1 / 32768.0), dtype=np.float32)
+            else:
+                data = self._samples[self._start:self._end].copy()
+            self._start = self._end = 0
+        self._reset_utterance()
         return data
 
+    def speech_ratio(self) -> float:
+        """Fraction of the recorded chunks that were speech (read before get_audio_data)
+        
+        The trailing silence that ended the utterance is not counted, so short
+        commands are not diluted by the mandatory silence_duration tail.
+        """
+        active_chunks = self.recording_chunks - self.silence_counter
+        if active_chunks <= 0:
+            return 0.0
+        return min(self.speech_chunks / active_chunks, 1.0)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_whisper_model(model_name: str, device: Optional[str], compile_model: bool):
+    """Load an openai-whisper model once per process, as (model, compiled)"""
+    import whisper
+    
+    model = whisper.load_model(model_name, device=device)
+    
+    if model.device.type == "cuda":
+        # transcribe() runs in float16 on CUDA and whisper's Linear/Conv1d cast their
+        # fp32 weights to the input dtype on every call; store those weights in float16
+        # instead (LayerNorms and the token embedding stay fp32, logits are unchanged)
+        for module in model.modules():
+            if isinstance(module, (whisper.model.Linear, whisper.model.Conv1d)):
+                module.half()
+    
+    # Whisper pads every window to 30 s, so the encoder always sees one shape
+    # and can be compiled (with CUDA graphs) once; the compiled graph starts at the
+    # conv1/gelu/conv2/positional-embedding prologue, which is fused with the blocks.
+    # The log-mel step stays eager: it runs once per input of arbitrary length.
+    if compile_model and model.device.type == "cuda":
+        import torch
+        if hasattr(torch, "compile"):
+            model.encoder = torch.compile(model.encoder, mode="reduce-overhead")
+            # The decoder's input grows by one token per step and its kv-cache hooks
+            # break the graph, so compile it with dynamic shapes and no CUDA graphs
+            model.decoder = torch.compile(model.decoder, dynamic=True, fullgraph=False)
+            logger.info("Whisper encoder and decoder compiled with torch.compile")
+            return model, True
+    return model, False
+
+
+@functools.lru_cache(maxsize=4)
+def _load_faster_whisper_model(model_name: str, device: str, compute_type: str,
+                               cpu_threads: int = 0, num_workers: int = 1):
+    """Load a faster-whisper model once per process (cpu_threads=0 lets CTranslate2 choose;
+    num_workers > 1 lets that many threads transcribe in parallel)"""
+    from faster_whisper import WhisperModel
+    return WhisperModel(model_name, device=device, compute_type=compute_type,
+                        cpu_threads=cpu_threads, num_workers=num_workers)
+
+
+def _decode_options(performance_mode: str = None) -> Dict[str, Any]:
+    """Extra Whisper decoding options: fast mode decodes once, greedily, with no
+    temperature fallback retries and no prompt carried between windows"""
+    if performance_mode == "fast":
+        return {"temperature": 0.0, "condition_on_previous_text": False}
+    return {}
+
+
+def _to_float32(audio_data: np.ndarray) -> np.ndarray:
+    """Whisper input: float32 in [-1, 1]; float32 audio is taken as already normalized"""
+    if audio_data.dtype == np.float32:
+        return audio_data
+    # Single pass and single allocation (astype + divide would make two)
+    return np.multiply(audio_data, np.float32(1 / 32768.0), dtype=np.float32)
+
+
+def _default_whisper_model(performance_mode: str = None) -> str:
+    """Whisper model name from the performance mode section or the global STT config"""
+    config = get_config()
+    if performance_mode:
+        stt_config = config.get_stt_config(performance_mode)
+        return stt_config.get('whisper', {}).get('default_model', 'tiny.en')
+    return config.get('stt.whisper.default_model', 'tiny.en')
+
 
 class WhisperSTT:
     """Whisper-based STT implementation - The heavyweight championÃ¢"""
@@ -179,32 +469,32 @@ class WhisperSTT:
         
         # Get model name from performance mode or fallback
         if model_name is None:
-            if performance_mode:
-                stt_config = config.get_stt_config(performance_mode)
-                model_name = stt_config.get('whisper', {}).get('default_model', 'tiny.en')
-            else:
-                model_name = config.get('stt.whisper.default_model', 'tiny.en')
+            model_name = _default_whisper_model(performance_mode)
         
         self.gpu_acceleration = optimizations.get('gpu_acceleration', False)
         self.model_name = model_name
+        self.decode_options = _decode_options(performance_mode)
             
+        compile_model = optimizations.get('compile_model', False)
         try:
-            import whisper
-            
             # Load model with GPU acceleration if available and enabled
+            # (models are shared by every engine in the process that asks for the same one)
             if self.gpu_acceleration:
                 import torch
                 if torch.cuda.is_available():
-                    self.model = whisper.load_model(model_name, device="cuda")
+                    self.model, self.compiled = _load_whisper_model(model_name, "cuda", compile_model)
                     logger.info(f"Whisper model '{model_name}' loaded with GPU acceleration")
                 else:
                     logger.warning("GPU acceleration requested but CUDA not available, falling back to CPU")
-                    self.model = whisper.load_model(model_name)
-                    logger.info(f"Whisper model '{model_name}' loaded on CPU")
+                    self.model, self.compiled = _load_whisper_model(model_name, "cpu", compile_model)
+                    logger.info(f"Whisper model '{model_name}' loaded on CPU (faster-whisper's int8 engine is faster here)")
             else:
-                self.model = whisper.load_model(model_name)
+                # Explicit: whisper.load_model would otherwise pick CUDA on its own
+                self.model, self.compiled = _load_whisper_model(model_name, "cpu", compile_model)
                 logger.info(f"Whisper model '{model_name}' loaded on CPU")
             
+            # FP16 on GPU; on CPU say FP32 up front instead of letting every call warn and fall back
+            self.decode_options["fp16"] = self.model.device.type == "cuda"
             self.available = True
         except ImportError:
             logger.error("Whisper not installed. Run: pip install openai-whisper")
@@ -213,6 +503,12 @@ class WhisperSTT:
             logger.error(f"Failed to load Whisper model: {e}")
             self.available = False
 
+    def warmup(self):
+        """Run one silent window through a compiled model so the first real call isn't slowed by compilation"""
+        if self.available and self.compiled:
+            self.model.transcribe(np.zeros(16000, dtype=np.float32), language="en", **self.decode_options)
+            logger.info("Whisper warmup complete")
+
     def transcribe(self, audio_data: np.ndarray, config: AudioConfig) -> str:
         """Transcribe audio using Whisper"""
         if not self.available:
@@ -223,10 +519,10 @@ class WhisperSTT:
         
         try:
             # Convert to float32 and normalize
-            audio_float = audio_data.astype(np.float32) / 32768.0
+            audio_float = _to_float32(audio_data)
             
             # Whisper expects the audio to be properly formatted
-            result = self.model.transcribe(audio_float, language="en")
+            result = self.model.transcribe(audio_float, language="en", **self.decode_options)
             
             return result.get("text", "").strip()
             
@@ -234,6 +530,117 @@ class WhisperSTT:
             logger.error(f"Whisper transcription failed: {e}")
             return ""
 
+    def transcribe_words(self, audio_data: np.ndarray, config: AudioConfig) -> List[Tuple[str, float]]:
+        """Transcribe audio as (word, end time in seconds) pairs, for committing a stream word by word"""
+        if not self.available or len(audio_data) == 0:
+            return []
+        
+        try:
+            result = self.model.transcribe(_to_float32(audio_data), language="en", word_timestamps=True,
+                                           **self.decode_options)
+            return [(word["word"].strip(), word["end"])
+                    for segment in result.get("segments", []) for word in segment.get("words", [])]
+            
+        except Exception as e:
+            logger.error(f"Whisper transcription failed: {e}")
+            return []
+
+
+class FasterWhisperSTT:
+    """faster-whisper (CTranslate2) STT implementation - Same brains, int8 muscles"""
+
+    def __init__(self, model_name: str = None, performance_mode: str = None):
+        if model_name is None:
+            model_name = _default_whisper_model(performance_mode)
+        self.model_name = model_name
+        self.decode_options = _decode_options(performance_mode)
+        self.num_workers = get_config().get('optimizations.stt_workers', 2)
+        self._batch_exec = None
+        self.device = "cpu"
+
+        try:
+            import ctranslate2
+            from faster_whisper import BatchedInferencePipeline
+
+            # int8 weights halve memory bandwidth and hit the int8 dot-product kernels;
+            # on GPU the activations stay in float16
+            self.device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+            compute_type = "int8_float16" if self.device == "cuda" else "int8"
+            cpu_threads = get_config().get('optimizations.cpu_threads', 0)
+            self.model = _load_faster_whisper_model(model_name, self.device, compute_type, cpu_threads, self.num_workers)
+            logger.info(f"faster-whisper model '{model_name}' loaded on {self.device.upper()} ({compute_type})")
+            # Long audio is split at VAD boundaries and the pieces decoded as one batch
+            self.batched_model = BatchedInferencePipeline(model=self.model)
+            self.available = True
+        except ImportError:
+            logger.error("faster-whisper not installed. Run: pip install faster-whisper")
+            self.available = False
+        except Exception as e:
+            logger.error(f"Failed to load faster-whisper model: {e}")
+            self.available = False
+
+    def transcribe(self, audio_data: np.ndarray, config: AudioConfig, hit_max_length: bool = False) -> str:
+        """Transcribe audio using faster-whisper (hit_max_length: the utterance was cut off
+        at max_recording_time, see AudioBuffer.hit_max_length)"""
+        if not self.available:
+            return "faster-whisper not available"
+        
+        if len(audio_data) == 0:
+            return ""
+        
+        try:
+            # Convert to float32 and normalize
+            audio_float = _to_float32(audio_data)
+            
+            # Greedy decoding; the built-in VAD drops silent stretches before decoding
+            if self._use_batched(len(audio_float), hit_max_length):
+                segments, _ = self.batched_model.transcribe(
+                    audio_float, language="en", beam_size=1, batch_size=8,
+                    vad_parameters={"min_silence_duration_ms": 500}, **self.decode_options,
+                )
+            else:
+                segments, _ = self.model.transcribe(
+                    audio_float, language="en", beam_size=1,
+                    vad_filter=True, vad_parameters={"min_silence_duration_ms": 500}, **self.decode_options,
+                )
+            
+            return "".join(segment.text for segment in segments).strip()
+            
+        except Exception as e:
+            logger.error(f"faster-whisper transcription failed: {e}")
+            return ""
+
+    def transcribe_words(self, audio_data: np.ndarray, config: AudioConfig) -> List[Tuple[str, float]]:
+        """Transcribe audio as (word, end time in seconds) pairs, for committing a stream word by word"""
+        if not self.available or len(audio_data) == 0:
+            return []
+        
+        try:
+            segments, _ = self.model.transcribe(
+                _to_float32(audio_data), language="en", beam_size=1, word_timestamps=True,
+                vad_filter=True, vad_parameters={"min_silence_duration_ms": 500}, **self.decode_options,
+            )
+            return [(word.word.strip(), word.end) for segment in segments for word in (segment.words or [])]
+            
+        except Exception as e:
+            logger.error(f"faster-whisper transcription failed: {e}")
+            return []
+
+    def _use_batched(self, num_samples: int, hit_max_length: bool = False) -> bool:
+        """Whether to split the audio at VAD boundaries and decode the pieces as one batch"""
+        if num_samples > BATCHED_MIN_SAMPLES:
+            return True
+        # On GPU, an utterance cut off by max_recording_time is long, continuous speech;
+        # several short decodes in one batch beat one long serial decode
+        return self.device == "cuda" and hit_max_length
+
+    def transcribe_batch(self, audio_list: List[np.ndarray], config: AudioConfig) -> List[str]:
+        """Transcribe independent utterances concurrently on the model's worker pool, in order"""
+        if self._batch_exec is None:
+            self._batch_exec = ThreadPoolExecutor(max_workers=self.num_workers,
+                                                  thread_name_prefix="faster-whisper")
+        return list(self._batch_exec.map(lambda audio: self.transcribe(audio, config), audio_list))
+
 
 class VoskSTT:
     """Vosk-based STT implementation - The lightweight speedsterÃ¢"""
@@ -246,6 +653,9 @@ class VoskSTT:
         try:
             import vosk
             self.model = vosk.Model(model_path)
+            # Recognizer reused across utterances (rebuilt only if the sample rate changes)
+            self._rec = None
+            self._rec_sr = None
             self.available = True
             logger.info(f"Vosk model loaded from {model_path}")
         except ImportError:
@@ -264,10 +674,7 @@ class VoskSTT:
             return ""
         
         try:
-            import vosk
-            
-            # Create recognizer
-            rec = vosk.KaldiRecognizer(self.model, config.sample_rate)
+            rec = self._recognizer(config.sample_rate)
             
             # Convert to bytes
             audio_bytes = audio_data.tobytes()
@@ -284,6 +691,58 @@ class VoskSTT:
             logger.error(f"Vosk transcription failed: {e}")
             return ""
 
+    def transcribe_words(self, audio_data: np.ndarray, config: AudioConfig) -> List[Tuple[str, float]]:
+        """Transcribe audio as (word, end time in seconds) pairs, for committing a stream word by word"""
+        if not self.available or len(audio_data) == 0:
+            return []
+        
+        try:
+            rec = self._recognizer(config.sample_rate)
+            rec.AcceptWaveform(audio_data.tobytes())
+            result = json.loads(rec.FinalResult())
+            return [(word["word"], word["end"]) for word in result.get("result", [])]
+                
+        except Exception as e:
+            logger.error(f"Vosk transcription failed: {e}")
+            return []
+
+    def _recognizer(self, sample_rate: int):
+        """The reused recognizer, reset for a new utterance (rebuilt if the sample rate changes)"""
+        if self._rec is None or self._rec_sr != sample_rate:
+            import vosk
+            self._rec = vosk.KaldiRecognizer(self.model, sample_rate)
+            self._rec.SetWords(True)  # Word timings in final results, for transcribe_words
+            self._rec_sr = sample_rate
+        else:
+            self._rec.Reset()
+        return self._rec
+
+
+def transcription_cache_path(filename: str, engine_id: str) -> str:
+    """Cache file for an audio file: hash of its first/last 64 KiB, size and engine id"""
+    size = os.path.getsize(filename)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, 'rb') as f:
+        digest.update(f.read(65536))
+        if size > 65536:
+            f.seek(max(size - 65536, 65536))
+            digest.update(f.read())
+    digest.update(size.to_bytes(8, 'little'))
+    digest.update(engine_id.encode('utf-8'))
+    return os.path.join(TRANSCRIPTION_CACHE_DIR, f"{digest.hexdigest()}.txt")
+
+
+def store_cached_transcription(cache_path: str, transcription: str):
+    """Atomically write a transcription to the cache (failures are only logged)"""
+    try:
+        os.makedirs(TRANSCRIPTION_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=TRANSCRIPTION_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(transcription)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache transcription: {e}")
+
 
 class WakeWordDetector:
     """Simple wake word detection - because we need to know when to listenÃ¢"""
@@ -296,24 +755,44 @@ class WakeWordDetector:
         self.wake_words = [word.lower() for word in wake_words]
         self.last_detection = 0
         self.cooldown = 2.0  # seconds
+        
+        # All wake words matched in one pass over the text when pyahocorasick is available
+        self._automaton = None
+        if ahocorasick is not None and self.wake_words:
+            automaton = ahocorasick.Automaton()
+            for wake_word in self.wake_words:
+                automaton.add_word(wake_word, wake_word)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find(self, text_lower: str) -> Optional[str]:
+        """First wake word contained in already-lowercased text, or None (no cooldown)"""
+        if self._automaton is not None:
+            for _, wake_word in self._automaton.iter(text_lower):
+                return wake_word
+            return None
+        
+        for wake_word in self.wake_words:
+            if wake_word in text_lower:
+                return wake_word
+        return None
 
     def detect(self, text: str) -> bool:
         """Detect wake word in transcribed text"""
         if not text:
             return False
         
-        text_lower = text.lower()
         current_time = time.time()
         
-        # Check cooldown to prevent spam
+        # Check cooldown to prevent spam (before paying for the lowercase copy)
         if current_time - self.last_detection < self.cooldown:
             return False
         
-        for wake_word in self.wake_words:
-            if wake_word in text_lower:
-                self.last_detection = current_time
-                logger.info(f"Wake word detected: {wake_word}")
-                return True
+        wake_word = self.find(text.lower())
+        if wake_word is not None:
+            self.last_detection = current_time
+            logger.info(f"Wake word detected: {wake_word}")
+            return True
         
         return False
 
@@ -342,14 +821,22 @@ class JarvisSTT:
         self.performance_mode = performance_mode
         self.config = AudioConfig(performance_mode)
         self.audio_buffer = AudioBuffer(debug=debug)
+        # listen_and_transcribe reuses one buffer so each call starts from the learned noise floor
+        self._listen_buffer = AudioBuffer(debug=debug)
         self.wake_detector = WakeWordDetector(wake_words)
         self.is_listening = False
         self.is_processing = False
         self.debug = debug
+        self.cache_transcriptions = config.get('stt.cache_transcriptions', True)
         
         # Initialize STT engine with performance mode
         if stt_engine.lower() == "whisper":
             self.stt_engine = WhisperSTT(model_name, performance_mode)
+        elif stt_engine.lower() == "faster-whisper":
+            self.stt_engine = FasterWhisperSTT(model_name, performance_mode)
+            if not self.stt_engine.available:
+                logger.warning("faster-whisper unavailable, falling back to openai-whisper")
+                self.stt_engine = WhisperSTT(model_name, performance_mode)
         elif stt_engine.lower() == "vosk":
             self.stt_engine = VoskSTT(model_name)
         else:
@@ -357,14 +844,23 @@ class JarvisSTT:
 
         logger.info(f"STT Engine loaded with performance mode: {performance_mode or 'default'}")
         
-        # Initialize PyAudio
+        # Whisper engines take normalized float32, so hand them that straight from the buffer
+        self.float_input = isinstance(self.stt_engine, (WhisperSTT, FasterWhisperSTT))
+        
+        # Initialize PyAudio; the input stream is opened on first use and then kept open
+        # (PortAudio's open is slow), with the callback routing audio to whoever is listening
         self.audio = pyaudio.PyAudio()
         self.stream = None
+        self._audio_sink: Optional[Callable[[np.ndarray], None]] = None
         
         # Callback for when speech is detected
         self.on_speech_callback: Optional[Callable[[str], None]] = None
         self.on_wake_word_callback: Optional[Callable[[], None]] = None
 
+    def set_max_buffer_seconds(self, seconds: float):
+        """Cap the continuous-listening buffer (the oldest audio is dropped past it)"""
+        self.audio_buffer.set_max_size(int(seconds * self.config.sample_rate))
+
     def set_speech_callback(self, callback: Callable[[str], None]):
         """Set callback for when speech is transcribed"""
         self.on_speech_callback = callback
@@ -373,15 +869,39 @@ class JarvisSTT:
         """Set callback for when wake word is detected"""
         self.on_wake_word_callback = callback
 
+    def set_audio_sink(self, sink: Optional[Callable[[np.ndarray], None]]):
+        """Send raw int16 microphone chunks to sink instead of utterance detection (None to stop)
+        
+        The sink runs on the PortAudio thread and must not block.
+        """
+        if sink is not None:
+            self._open_stream()
+        self._audio_sink = sink
+
     def start_listening(self):
         """Start continuous listening"""
         if self.is_listening:
             logger.warning("Already listening")
             return
         
+        # Drop any half-recorded utterance from before the last stop
+        self.audio_buffer.clear()
         self.is_listening = True
+        self._open_stream()
+        logger.info("Started listening for audio...")
+
+    def stop_listening(self):
+        """Stop listening (the stream stays open and its audio is dropped until restarted)"""
+        if not self.is_listening:
+            return
         
-        # Open audio stream
+        self.is_listening = False
+        logger.info("Stopped listening")
+
+    def _open_stream(self):
+        """Open the shared input stream once per JarvisSTT"""
+        if self.stream is not None:
+            return
         self.stream = self.audio.open(
             format=self.config.format,
             channels=self.config.channels,
@@ -390,34 +910,32 @@ class JarvisSTT:
             frames_per_buffer=self.config.chunk_size,
             stream_callback=self._audio_callback
         )
-        
         self.stream.start_stream()
-        logger.info("Started listening for audio...")
 
-    def stop_listening(self):
-        """Stop listening"""
-        if not self.is_listening:
-            return
-        
+    def close(self):
+        """Close the input stream and release PyAudio"""
         self.is_listening = False
-        
-        if self.stream:
+        if self.stream is not None:
             self.stream.stop_stream()
             self.stream.close()
             self.stream = None
-        
-        logger.info("Stopped listening")
+        if hasattr(self, 'audio'):
+            self.audio.terminate()
+            del self.audio
 
     def _audio_callback(self, in_data, frame_count, time_info, status):
         """Audio callback for continuous processing"""
-        if not self.is_listening:
-            return (None, pyaudio.paComplete)
+        # A listen_and_transcribe call or a streaming consumer in progress takes the audio
+        audio_sink = self._audio_sink
+        if audio_sink is not None:
+            audio_sink(np.frombuffer(in_data, dtype=np.int16))
+            return (None, pyaudio.paContinue)
         
-        # Convert audio data to numpy array
-        audio_chunk = np.frombuffer(in_data, dtype=np.int16)
+        if not self.is_listening:
+            return (None, pyaudio.paContinue)
         
         # Add to buffer and check for complete utterance
-        utterance_complete = self.audio_buffer.add_chunk(audio_chunk, self.config)
+        utterance_complete = self.audio_buffer.ingest_bytes(in_data, self.config)
         
         if utterance_complete:
             logger.info(f"🎆 Utterance complete! is_processing: {self.is_processing}")
@@ -443,11 +961,15 @@ class JarvisSTT:
         
         try:
             # Get audio data from buffer
-            audio_data = self.audio_buffer.get_audio_data()
+            speech_ratio = self.audio_buffer.speech_ratio()
+            hit_max_length = self.audio_buffer.hit_max_length
+            audio_data = self.audio_buffer.get_audio_data(as_float=self.float_input)
             
-            if len(audio_data) > 0:
+            if speech_ratio < MIN_SPEECH_RATIO:
+                logger.info(f"Skipping transcription - only {speech_ratio:.0%} of the utterance was speech (minimum {MIN_SPEECH_RATIO:.0%})")
+            elif len(audio_data) > 0:
                 # Transcribe audio
-                transcription = self.stt_engine.transcribe(audio_data, self.config)
+                transcription = self._transcribe_utterance(audio_data, hit_max_length)
                 
                 if transcription:
                     logger.info(f"Transcribed: '{transcription}'")
@@ -467,6 +989,12 @@ class JarvisSTT:
         finally:
             self.is_processing = False
 
+    def _transcribe_utterance(self, audio_data: np.ndarray, hit_max_length: bool) -> str:
+        """Transcribe a recorded utterance; faster-whisper batches ones cut off at max length"""
+        if isinstance(self.stt_engine, FasterWhisperSTT):
+            return self.stt_engine.transcribe(audio_data, self.config, hit_max_length=hit_max_length)
+        return self.stt_engine.transcribe(audio_data, self.config)
+
     def listen_and_transcribe(self, timeout: float = 10.0) -> str:
         """Listen from microphone and return transcription text
         
@@ -478,28 +1006,29 @@ class JarvisSTT:
         """
         if self.debug: logger.info(f"Starting listen_and_transcribe with {timeout}s timeout")
         
-        # Create a temporary audio buffer for this session
-        temp_buffer = AudioBuffer(debug=self.debug)
+        # Reuse the session buffer: fresh utterance state, but keep the adaptive thresholds
+        temp_buffer = self._listen_buffer
+        temp_buffer.clear()
         transcription = ""
         
+        # PortAudio's thread delivers chunks through a queue; this thread only runs the VAD
+        chunks = queue.Queue()
+        
         try:
-            # Open audio stream for recording
-            stream = self.audio.open(
-                format=self.config.format,
-                channels=self.config.channels,
-                rate=self.config.sample_rate,
-                input=True,
-                frames_per_buffer=self.config.chunk_size
-            )
+            self.set_audio_sink(chunks.put)
             
             if self.debug: logger.info("Listening for speech...")
-            start_time = time.time()
+            deadline = time.time() + timeout
             
-            while time.time() - start_time < timeout:
-                # Read audio chunk
-                try:
-                    data = stream.read(self.config.chunk_size, exception_on_overflow=False)
-                    audio_chunk = np.frombuffer(data, dtype=np.int16)
+            try:
+                while True:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        audio_chunk = chunks.get(timeout=remaining)
+                    except queue.Empty:
+                        break
                     
                     # Add to buffer and check for complete utterance
                     utterance_complete = temp_buffer.add_chunk(audio_chunk, self.config)
@@ -507,24 +1036,20 @@ class JarvisSTT:
                     if utterance_complete:
                         logger.info("Complete utterance detected, transcribing...")
                         # Get the audio data
-                        audio_data = temp_buffer.get_audio_data()
+                        speech_ratio = temp_buffer.speech_ratio()
+                        hit_max_length = temp_buffer.hit_max_length
+                        audio_data = temp_buffer.get_audio_data(as_float=self.float_input)
                         
-                        if len(audio_data) > 0:
+                        if speech_ratio < MIN_SPEECH_RATIO:
+                            logger.info(f"Skipping transcription - only {speech_ratio:.0%} of the utterance was speech (minimum {MIN_SPEECH_RATIO:.0%})")
+                        elif len(audio_data) > 0:
                             # Transcribe the audio
-                            transcription = self.stt_engine.transcribe(audio_data, self.config)
+                            transcription = self._transcribe_utterance(audio_data, hit_max_length)
                             logger.info(f"Transcription result: '{transcription}'")
                         break
-                        
-                except Exception as e:
-                    logger.warning(f"Audio read error: {e}")
-                    continue
-                    
-                # Small delay to prevent high CPU usage
-                time.sleep(0.01)
-            
-            # Clean up
-            stream.stop_stream()
-            stream.close()
+            finally:
+                # Hand the shared stream back; it stays open for the next call
+                self._audio_sink = None
             
             if self.debug and not transcription:
                 logger.info("No speech detected within timeout period")
@@ -535,25 +1060,51 @@ class JarvisSTT:
             logger.error(f"Error in listen_and_transcribe: {e}")
             return ""
     
+    def transcribe_batch(self, audio_list: List[np.ndarray]) -> List[str]:
+        """Transcribe several independent utterances, in order
+        
+        faster-whisper runs them in parallel on its worker pool; the other engines
+        (openai-whisper's kv-cache hooks are not thread-safe) take them one by one.
+        """
+        if hasattr(self.stt_engine, 'transcribe_batch'):
+            return self.stt_engine.transcribe_batch(audio_list, self.config)
+        return [self.stt_engine.transcribe(audio, self.config) for audio in audio_list]
+    
     def transcribe_file(self, filename: str) -> str:
         """Transcribe audio from file - for testing"""
         try:
+            # Re-transcribing the same file (tuning runs) is served from the disk cache
+            cache_path = None
+            if self.cache_transcriptions and getattr(self.stt_engine, 'available', False):
+                cache_path = self._transcription_cache_path(filename)
+                if os.path.exists(cache_path):
+                    with open(cache_path, 'r', encoding='utf-8') as f:
+                        return f.read()
+            
             # Read audio file
             with wave.open(filename, 'rb') as wav_file:
                 frames = wav_file.readframes(wav_file.getnframes())
                 audio_data = np.frombuffer(frames, dtype=np.int16)
             
-            return self.stt_engine.transcribe(audio_data, self.config)
+            transcription = self.stt_engine.transcribe(audio_data, self.config)
+            
+            if cache_path and transcription:
+                store_cached_transcription(cache_path, transcription)
+            return transcription
             
         except Exception as e:
             logger.error(f"Error transcribing file: {e}")
             return ""
 
+    def _transcription_cache_path(self, filename: str) -> str:
+        """Cache file for an audio file transcribed by this engine and model"""
+        engine_id = f"{type(self.stt_engine).__name__}:{getattr(self.stt_engine, 'model_name', '')}"
+        return transcription_cache_path(filename, engine_id)
+
     def __del__(self):
         """Cleanup"""
-        self.stop_listening()
-        if hasattr(self, 'audio'):
-            self.audio.terminate()
+        if hasattr(self, 'stream'):
+            self.close()
 
 # Example usage and testing
 
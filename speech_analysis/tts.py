@@ -4,15 +4,21 @@ This handles text-to-speech with multiple engines and voice cloning capabilities
 """
 
 import asyncio
+import random
 import threading
 import time
 import os
 import io
 import wave
 import tempfile
+import uuid
+import functools
+import hashlib
 import logging
 from typing import Optional, Callable, Dict, Any, List
+from collections import OrderedDict
 from dataclasses import dataclass
+from concurrent.futures import Future
 from pathlib import Path
 import numpy as np
 import pyaudio
@@ -20,8 +26,15 @@ import queue
 import json
 import sys
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # Add parent directory to path to import config_manager
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 from config_manager import get_config
 
 # Configure logging
@@ -29,6 +42,26 @@ from config_manager import get_config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# On-disk cache of synthesized canned phrases, keyed by text + engine/voice settings
+CANNED_AUDIO_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "jarvis", "tts")
+
+# Synthesized WAVs only live long enough to be read back, so keep them in RAM where possible
+_SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def _scratch_wav_path() -> str:
+    """Unique path for an engine to write a WAV to (the file is not created here)"""
+    return os.path.join(_SCRATCH_DIR, f"jarvis_{os.getpid()}_{uuid.uuid4().hex}.wav")
+
+
+def _read_wav_frames(path: str) -> bytes:
+    """Read a WAV's frames and delete the file"""
+    try:
+        with wave.open(path, 'rb') as wav_file:
+            return wav_file.readframes(wav_file.getnframes())
+    finally:
+        os.unlink(path)
+
 @dataclass
 class TTSConfig:
     """TTS configuration settings"""
@@ -44,70 +77,190 @@ class TTSConfig:
 
 
 class AudioPlayer:
-    """Handles audio playback - because we need to hear this beauty"""
+    """Handles audio playback - because we need to hear this beauty
 
-    def __init__(self, config: TTSConfig):
+    PortAudio pulls audio from a ring buffer in callback mode, on the device clock;
+    the playback worker only copies queued audio into the ring.
+    """
+
+    def __init__(self, config: TTSConfig, ring_seconds: float = 1.0):
         self.config = config
         self.audio = pyaudio.PyAudio()
         self.is_playing = False
-        self.playback_queue = queue.Queue()
+        # Set whenever nothing is queued or playing; speakers block on it instead of polling
+        self.done_event = threading.Event()
+        self.done_event.set()
+        self._pending = 0  # Items queued or playing; done_event is set only when it drops to 0
+        self._pending_lock = threading.Lock()
+        self.playback_queue = queue.SimpleQueue()  # (generation, audio); single consumer, no join()
         self.playback_thread = None
+        self._generation = 0  # Bumped by stop_playback: audio queued before that is dropped
+        # One output stream, opened on first playback and kept open between items
+        self._stream = None
+        self._stream_lock = threading.Lock()
+        # Ring buffer between the worker (writer) and the PortAudio callback (reader);
+        # read/write positions only ever grow, the ring index is position % size
+        self._frame_bytes = self.audio.get_sample_size(config.format) * config.channels
+        self._ring = bytearray(int(config.sample_rate * ring_seconds) * self._frame_bytes)
+        self._ring_view = memoryview(self._ring)
+        self._silence = memoryview(bytes(len(self._ring)))
+        self._ring_read = 0
+        self._ring_write = 0
+        self._ring_cond = threading.Condition()
         
     def play_audio_data(self, audio_data: bytes):
         """Play audio data directly"""
         if self.is_playing:
             logger.warning("Already playing audio, queuing...")
             
-        self.playback_queue.put(audio_data)
+        with self._pending_lock:
+            self._pending += 1
+            self.done_event.clear()
+        self.playback_queue.put((self._generation, audio_data))
         
         if not self.playback_thread or not self.playback_thread.is_alive():
             self.playback_thread = threading.Thread(target=self._playback_worker, daemon=True)
             self.playback_thread.start()
 
-    def _playback_worker(self):
-        """Worker thread for audio playback"""
-        while True:
-            try:
-                audio_data = self.playback_queue.get(timeout=1.0)
-                if audio_data is None:  # Shutdown signal
-                    break
-                    
-                self.is_playing = True
-                
-                # Open stream for playback
-                stream = self.audio.open(
+    def _get_stream(self):
+        """The shared output stream, opened on first use and restarted after idling"""
+        with self._stream_lock:
+            if self._stream is None:
+                self._stream = self.audio.open(
                     format=self.config.format,
                     channels=self.config.channels,
                     rate=self.config.sample_rate,
                     output=True,
-                    frames_per_buffer=self.config.chunk_size
+                    frames_per_buffer=self.config.chunk_size,
+                    stream_callback=self._pa_callback
                 )
+                self._stream.start_stream()
+            elif self._stream.is_stopped():
+                self._stream.start_stream()
+            return self._stream
+
+    def _pause_stream(self):
+        """Stop the callback while nothing is queued (the stream stays open for the next item)"""
+        with self._stream_lock:
+            if self._stream is not None and not self._stream.is_stopped():
+                self._stream.stop_stream()
+
+    def _close_stream(self):
+        """Close the shared output stream, if open"""
+        with self._stream_lock:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+                self._stream = None
+
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: hand over the next frames from the ring, padded with silence"""
+        wanted = frame_count * self._frame_bytes
+        size = len(self._ring)
+        ring = self._ring_view
+        with self._ring_cond:
+            n = min(wanted, self._ring_write - self._ring_read)
+            start = self._ring_read % size
+            first = min(n, size - start)
+            # One bytes allocation per callback: memoryview slices are joined without copies
+            if first == wanted:
+                out = bytes(ring[start:start + first])
+            else:
+                padding = self._silence[:wanted - n] if wanted - n <= len(self._silence) else bytes(wanted - n)
+                out = b"".join((ring[start:start + first], ring[:n - first], padding))
+            self._ring_read += n
+            self._ring_cond.notify_all()
+        return (out, pyaudio.paContinue)
+
+    def _write_ring(self, audio_data: bytes, generation: int):
+        """Copy audio into the ring as space frees up (until stop_playback)"""
+        data = memoryview(audio_data)
+        size = len(self._ring)
+        pos = 0
+        while pos < len(data):
+            with self._ring_cond:
+                while self._ring_write - self._ring_read == size:
+                    if self._stream is None or not self._stream.is_active():
+                        return  # Nothing is draining the ring
+                    self._ring_cond.wait(timeout=0.5)
+                if generation != self._generation:
+                    return  # Stopped
+                n = min(size - (self._ring_write - self._ring_read), len(data) - pos)
+                start = self._ring_write % size
+                first = min(n, size - start)
+                self._ring[start:start + first] = data[pos:pos + first]
+                if first < n:
+                    self._ring[:n - first] = data[pos + first:pos + n]
+                self._ring_write += n
+            pos += n
+
+    def _wait_drained(self, generation: int):
+        """Block until the callback has consumed everything written to the ring (or playback stops)"""
+        with self._ring_cond:
+            while (self._ring_read < self._ring_write and generation == self._generation
+                   and self._stream is not None and self._stream.is_active()):
+                self._ring_cond.wait(timeout=0.1)
+
+    def _playback_worker(self):
+        """Worker thread for audio playback"""
+        while True:
+            # Blocks until there is work; the None posted on cleanup wakes it to exit
+            item = self.playback_queue.get()
+            if item is None:  # Shutdown signal
+                self._close_stream()
+                break
+            generation, audio_data = item
+            finished = False
+            
+            try:
+                # Audio queued before a stop_playback is dropped
+                if generation == self._generation:
+                    self.is_playing = True
+                    
+                    # Reuse the open stream: no device setup per utterance
+                    self._get_stream()
+                    
+                    # Feed the ring; PortAudio plays it at its own pace
+                    self._write_ring(audio_data, generation)
+                    self._wait_drained(generation)
+                    
+                    self.is_playing = False
                 
-                # Play audio in chunks
-                for i in range(0, len(audio_data), self.config.chunk_size):
-                    chunk = audio_data[i:i + self.config.chunk_size]
-                    stream.write(chunk)
-                
-                stream.stop_stream()
-                stream.close()
-                
-                self.is_playing = False
-                self.playback_queue.task_done()
+                finished = True
+                if self._item_done():
+                    # Idle: don't keep the callback feeding silence
+                    self._pause_stream()
                 
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Playback error: {e}")
                 self.is_playing = False
+                if not finished:
+                    self._item_done()
+
+    def _item_done(self) -> bool:
+        """Count one queued item as finished; True (and done_event set) once none are left"""
+        with self._pending_lock:
+            self._pending -= 1
+            if self._pending == 0:
+                self.done_event.set()
+                return True
+            return False
 
     def stop_playback(self):
-        """Stop all playback"""
-        self.playback_queue.put(None)  # Shutdown signal
+        """Stop all playback: the current item, anything queued and what's left in the ring"""
+        with self._ring_cond:
+            self._generation += 1
+            self._ring_read = self._ring_write = 0
+            self._ring_cond.notify_all()
         self.is_playing = False
 
     def __del__(self):
         """Cleanup"""
-        self.stop_playback()
+        if hasattr(self, '_ring_cond'):
+            self.stop_playback()
+            self.playback_queue.put(None)  # Shutdown signal
+        if hasattr(self, '_stream_lock'):
+            self._close_stream()
         if hasattr(self, 'audio'):
             self.audio.terminate()
 
@@ -121,9 +274,12 @@ class PyttsxTTS:
             self.engine = pyttsx3.init()
             self.available = True
             self.config = config
+            # One engine for the process: drivers such as espeak sit on process-wide
+            # library state, so the speech worker and speak_directly take turns
+            self._engine_lock = threading.Lock()
 
             # Configure voice properties
-            self._setup_voice()
+            self._setup_voice(self.engine)
             logger.info("pyttsx3 TTS engine initialized")
 
         except ImportError:
@@ -133,13 +289,13 @@ class PyttsxTTS:
             logger.error(f"Failed to initialize pyttsx3: {e}")
             self.available = False
 
-    def _setup_voice(self):
+    def _setup_voice(self, engine):
         """Setup voice properties for Jarvis-like speech"""
         if not self.available:
             return
 
         # Get available voices
-        voices = self.engine.getProperty('voices')
+        voices = engine.getProperty('voices')
 
         # Try to find a suitable voice (prefer male, British if available)
         selected_voice = None
@@ -150,40 +306,41 @@ class PyttsxTTS:
                 break
 
         if selected_voice:
-            self.engine.setProperty('voice', selected_voice)
+            engine.setProperty('voice', selected_voice)
             logger.info(f"Selected voice: {selected_voice}")
 
         # Set speech properties
-        self.engine.setProperty('rate', self.config.voice_speed)
-        self.engine.setProperty('volume', self.config.voice_volume)
+        engine.setProperty('rate', self.config.voice_speed)
+        engine.setProperty('volume', self.config.voice_volume)
 
     def synthesize(self, text: str) -> bytes:
         """Synthesize text to audio bytes"""
+        return self.synthesize_many([text])[0]
+
+    def synthesize_many(self, texts: List[str]) -> List[bytes]:
+        """Synthesize several texts in one engine run (a single runAndWait), in order"""
         if not self.available:
             logger.error("pyttsx3 not available")
-            return b""
+            return [b"" for _ in texts]
 
+        # pyttsx3 can only save to a path; use a RAM-backed one (tmpfs) when available
+        tmp_paths = [_scratch_wav_path() for _ in texts]
         try:
-            # Create temporary file for audio output
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                tmp_path = tmp_file.name
+            # Queue every file, then let the engine render them back to back
+            with self._engine_lock:
+                for text, tmp_path in zip(texts, tmp_paths):
+                    self.engine.save_to_file(text, tmp_path)
+                self.engine.runAndWait()
 
-            # Save speech to file
-            self.engine.save_to_file(text, tmp_path)
-            self.engine.runAndWait()
-
-            # Read audio data
-            with wave.open(tmp_path, 'rb') as wav_file:
-                audio_data = wav_file.readframes(wav_file.getnframes())
-
-            # Cleanup
-            os.unlink(tmp_path)
-
-            return audio_data
+            # Read audio data (and remove the files)
+            return [_read_wav_frames(tmp_path) for tmp_path in tmp_paths]
 
         except Exception as e:
             logger.error(f"pyttsx3 synthesis failed: {e}")
-            return b""
+            for tmp_path in tmp_paths:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+            return [b"" for _ in texts]
 
     def speak_directly(self, text: str):
         """Speak text directly without returning audio data"""
@@ -191,8 +348,9 @@ class PyttsxTTS:
             return
 
         try:
-            self.engine.say(text)
-            self.engine.runAndWait()
+            with self._engine_lock:
+                self.engine.say(text)
+                self.engine.runAndWait()
         except Exception as e:
             logger.error(f"Direct speech failed: {e}")
 
@@ -205,6 +363,7 @@ class CoquiTTS:
         try:
             from TTS.api import TTS
             self.tts = TTS(model_name=model_name)
+            self.model_name = model_name
             self.available = True
             self.config = config
 
@@ -224,27 +383,22 @@ class CoquiTTS:
             return b""
 
         try:
-            # Create temporary file for output
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                tmp_path = tmp_file.name
-
-            # Synthesize speech
+            # Synthesize speech straight to samples (no WAV file in between)
             if speaker_wav and os.path.exists(speaker_wav):
                 # Use voice cloning
-                self.tts.tts_to_file(text=text, speaker_wav=speaker_wav, file_path=tmp_path)
+                wav = self.tts.tts(text=text, speaker_wav=speaker_wav)
                 logger.info(f"Voice cloned synthesis using: {speaker_wav}")
             else:
                 # Use default voice
-                self.tts.tts_to_file(text=text, file_path=tmp_path)
-
-            # Read audio data
-            with wave.open(tmp_path, 'rb') as wav_file:
-                audio_data = wav_file.readframes(wav_file.getnframes())
+                wav = self.tts.tts(text=text)
 
-            # Cleanup
-            os.unlink(tmp_path)
-
-            return audio_data
+            # Float samples to int16 PCM, peak-normalized as tts_to_file's WAV writer does;
+            # voice_volume (which Coqui itself ignores) is folded into the same multiply
+            samples = np.asarray(wav, dtype=np.float32)
+            if len(samples) == 0:
+                return b""
+            samples *= 32767 * self.config.voice_volume / max(0.01, float(np.max(np.abs(samples))))
+            return samples.astype(np.int16).tobytes()
 
         except Exception as e:
             logger.error(f"Coqui TTS synthesis failed: {e}")
@@ -255,44 +409,66 @@ class CoquiTTS:
         return self.synthesize(text, speaker_wav=source_audio_path)
 
 
+@functools.lru_cache(maxsize=512)
+def _enhance_response(text: str, context: str) -> str:
+    """Personality enhancement proper; pure, and the same phrases recur all session"""
+    # Add formal address if not present
+    if "sir" not in text.lower() and len(text) > 10:
+        if text.endswith('.'):
+            text = text[:-1] + ", sir."
+        else:
+            text += ", sir."
+
+    # Add context-specific enhancements
+    if context == "confirmation":
+        text = f"Certainly. {text}"
+    elif context == "information":
+        text = f"According to my records, {text.lower()}"
+    elif context == "action":
+        text = f"Right away. {text}"
+
+    return text
+
+
 class JarvisPersonality:
     """Jarvis personality and speech patterns - The secret sauce"""
 
 
     def __init__(self):
+        # Tuples: fixed phrase sets, indexed directly by get_contextual_response
         self.formal_responses = {
-            "greeting": [
+            "greeting": (
                 "Good morning, sir.",
                 "Good afternoon, sir.",
                 "Good evening, sir.",
                 "How may I assist you today, sir?",
                 "At your service, sir."
-            ],
-            "acknowledgment": [
+            ),
+            "acknowledgment": (
                 "Certainly, sir.",
                 "Right away, sir.",
                 "Of course, sir.",
                 "Consider it done, sir.",
                 "Immediately, sir."
-            ],
-            "thinking": [
+            ),
+            "thinking": (
                 "Let me check on that for you, sir.",
                 "One moment please, sir.",
                 "Allow me to process that, sir.",
                 "Searching for that information, sir."
-            ],
-            "error": [
+            ),
+            "error": (
                 "I'm afraid I don't understand, sir.",
                 "Could you please rephrase that, sir?",
                 "I'm having difficulty with that request, sir.",
                 "I don't have that information at the moment, sir."
-            ],
-            "goodbye": [
+            ),
+            "goodbye": (
                 "Until next time, sir.",
                 "Have a pleasant day, sir.",
                 "Goodbye, sir.",
                 "I'll be here when you need me, sir."
-            ]
+            )
         }
 
         self.context_responses = {
@@ -306,31 +482,15 @@ class JarvisPersonality:
         """Add Jarvis personality to response text"""
         if not text:
             return text
-
-        # Add formal address if not present
-        if "sir" not in text.lower() and len(text) > 10:
-            if text.endswith('.'):
-                text = text[:-1] + ", sir."
-            else:
-                text += ", sir."
-
-        # Add context-specific enhancements
-        if context == "confirmation":
-            text = f"Certainly. {text}"
-        elif context == "information":
-            text = f"According to my records, {text.lower()}"
-        elif context == "action":
-            text = f"Right away. {text}"
-
-        return text
+        return _enhance_response(text, context)
 
     def get_contextual_response(self, response_type: str, **kwargs) -> str:
         """Get contextual response with variables"""
         if response_type in self.context_responses:
             return self.context_responses[response_type].format(**kwargs)
         elif response_type in self.formal_responses:
-            import random
-            return random.choice(self.formal_responses[response_type])
+            responses = self.formal_responses[response_type]
+            return responses[random.randrange(len(responses))]
         else:
             return "I'm at your service, sir."
 
@@ -350,10 +510,13 @@ class JarvisTTS:
         self.jarvis_voice_path = jarvis_voice_path
 
         # Initialize TTS engine
+        self._engine_ready = threading.Event()
         if tts_engine.lower() == "pyttsx3":
             self.tts_engine = PyttsxTTS(self.config)
         elif tts_engine.lower() == "coqui":
-            self.tts_engine = CoquiTTS(self.config, model_name)
+            # Importing TTS and building the model takes seconds; do it (and the first,
+            # slowest synthesis) in the background, and let tts_engine wait for it
+            threading.Thread(target=self._load_coqui, args=(model_name,), daemon=True).start()
         elif tts_engine.lower() == "system":
             self.tts_engine = None  # Use system say directly
         else:
@@ -367,12 +530,45 @@ class JarvisTTS:
         config = get_config()
         optimizations = config.get_optimizations_config()
         self.non_blocking_tts = optimizations.get('non_blocking_tts', False)
-        self.speech_queue = queue.Queue()
+        self.speech_queue = queue.SimpleQueue()
+        self.speech_batch_size = 4  # Queued items synthesized together in one engine run
         self.speech_thread = None
         self.is_speech_thread_running = False
+        # Guards starting and stopping the worker, so speak never queues behind a stop signal
+        self._speech_lock = threading.Lock()
+        
+        # Canned phrases (formal_responses) are synthesized once, then replayed from RAM or disk
+        self.cache_canned_audio = optimizations.get('cache_canned_audio', True)
+        self._canned_texts = frozenset(
+            self.personality.enhance_response(phrase, context)
+            for context, phrases in self.personality.formal_responses.items()
+            for phrase in phrases
+        )
+        self._audio_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._audio_cache_lock = threading.Lock()
+        self.audio_cache_size = 64
 
         logger.info(f"Jarvis TTS initialized with {tts_engine} engine, non-blocking: {self.non_blocking_tts}")
 
+    @property
+    def tts_engine(self):
+        """The synthesis engine (blocks until a background load has finished)"""
+        self._engine_ready.wait()
+        return self._tts_engine
+
+    @tts_engine.setter
+    def tts_engine(self, engine):
+        self._tts_engine = engine
+        self._engine_ready.set()
+
+    def _load_coqui(self, model_name: str):
+        """Background loader: build the Coqui engine and run one throwaway synthesis"""
+        engine = CoquiTTS(self.config, model_name)
+        if engine.available:
+            engine.synthesize("Hello.")
+            logger.info("Coqui TTS warmed up")
+        self.tts_engine = engine
+
     def set_speech_callbacks(self, 
                            on_start: Optional[Callable[[], None]] = None,
                            on_end: Optional[Callable[[], None]] = None):
@@ -380,52 +576,107 @@ class JarvisTTS:
         self.on_speech_start_callback = on_start
         self.on_speech_end_callback = on_end
 
-    def _speech_worker(self):
-        """Worker thread for non-blocking speech processing"""
-        self.is_speech_thread_running = True
-        while self.is_speech_thread_running:
+    def _speech_worker(self, speech_queue: queue.SimpleQueue):
+        """Worker thread for non-blocking speech processing (one per speech_queue)"""
+        stopping = False
+        while not stopping:
+            batch = []
             try:
-                speech_item = self.speech_queue.get(timeout=1.0)
+                # Blocks until there is work; stop_speaking's None wakes it to exit
+                speech_item = speech_queue.get()
                 if speech_item is None:  # Shutdown signal
                     break
                 
-                text, context, use_personality = speech_item
-                self._speak_blocking(text, context, use_personality)
-                self.speech_queue.task_done()
+                # Take whatever else is already waiting, so it is rendered in the same engine run
+                batch = [speech_item]
+                while len(batch) < self.speech_batch_size:
+                    try:
+                        speech_item = speech_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if speech_item is None:  # Shutdown signal: finish this batch first
+                        stopping = True
+                        break
+                    batch.append(speech_item)
+                
+                self._speak_batch(batch)
                 
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Speech worker error: {e}")
+                # Don't leave callers waiting on speech that will never happen
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+        
+        # Nothing else will read this queue: release anyone waiting on what is left in it
+        while True:
+            try:
+                speech_item = speech_queue.get_nowait()
+            except queue.Empty:
+                break
+            if speech_item is not None:
+                speech_item[-1].cancel()
+
+    def _speak_batch(self, batch: List[tuple]):
+        """Speak queued (text, context, use_personality, future) items in order, synthesizing them together"""
+        texts = [self._enhance_text(text, context, use_personality)
+                 for text, context, use_personality, _ in batch]
+        audio_list = [self._cached_audio(text) for text in texts]
+        pending = [i for i, audio_data in enumerate(audio_list) if audio_data is None]
+        if len(pending) > 1 and isinstance(self.tts_engine, PyttsxTTS):
+            rendered = self.tts_engine.synthesize_many([texts[i] for i in pending])
+            for i, audio_data in zip(pending, rendered):
+                audio_list[i] = audio_data
+                self._store_cached_audio(texts[i], audio_data)
+        for enhanced_text, audio_data, (_, _, _, future) in zip(texts, audio_list, batch):
+            try:
+                self._speak_enhanced(enhanced_text, audio_data)
+                future.set_result(None)
+            except Exception as e:
+                future.set_exception(e)
+
+    def speak(self, text: str, context: str = "general", use_personality: bool = True) -> Optional[Future]:
+        """Speak text with Jarvis personality
 
-    def speak(self, text: str, context: str = "general", use_personality: bool = True):
-        """Speak text with Jarvis personality"""
+        In non-blocking mode, returns a Future that completes once the text has been
+        spoken (call .result() to wait for it); blocking mode returns None when done.
+        """
         if not text:
-            return
+            return None
         
         if self.non_blocking_tts:
-            # Queue speech for non-blocking processing
-            self.speech_queue.put((text, context, use_personality))
-            
-            # Start worker thread if not running
-            if not self.speech_thread or not self.speech_thread.is_alive():
-                self.speech_thread = threading.Thread(target=self._speech_worker, daemon=True)
-                self.speech_thread.start()
+            # Queue speech for non-blocking processing; one worker keeps utterances in order
+            future = Future()
+            with self._speech_lock:
+                self.speech_queue.put((text, context, use_personality, future))
+                
+                # Start worker thread if not running (or already told to stop)
+                if not self.is_speech_thread_running or not self.speech_thread.is_alive():
+                    self.is_speech_thread_running = True
+                    self.speech_thread = threading.Thread(target=self._speech_worker, args=(self.speech_queue,),
+                                                          daemon=True)
+                    self.speech_thread.start()
+            return future
         else:
             # Process speech immediately (blocking)
             self._speak_blocking(text, context, use_personality)
+            return None
 
     def _speak_blocking(self, text: str, context: str = "general", use_personality: bool = True):
         """Internal blocking speech implementation"""
         if not text:
             return
 
-        # Enhance text with personality
+        self._speak_enhanced(self._enhance_text(text, context, use_personality))
+
+    def _enhance_text(self, text: str, context: str = "general", use_personality: bool = True) -> str:
+        """Enhance text with personality"""
         if use_personality and self.config.jarvis_personality:
-            enhanced_text = self.personality.enhance_response(text, context)
-        else:
-            enhanced_text = text
+            return self.personality.enhance_response(text, context)
+        return text
 
+    def _speak_enhanced(self, enhanced_text: str, audio_data: Optional[bytes] = None):
+        """Synthesize (unless already synthesized) and play, firing the speech callbacks"""
         logger.info(f"Speaking: '{enhanced_text}'")
 
         # Trigger start callback
@@ -433,20 +684,22 @@ class JarvisTTS:
             self.on_speech_start_callback()
 
         try:
-            # Synthesize speech
-            if isinstance(self.tts_engine, CoquiTTS) and self.jarvis_voice_path:
-                # Use voice cloning if available
-                audio_data = self.tts_engine.clone_voice(enhanced_text, self.jarvis_voice_path)
-            else:
-                audio_data = self.tts_engine.synthesize(enhanced_text)
+            # Synthesize speech (batched and canned items may arrive already synthesized)
+            if audio_data is None:
+                audio_data = self._cached_audio(enhanced_text)
+            if audio_data is None:
+                audio_data = self._synthesize(enhanced_text)
+                self._store_cached_audio(enhanced_text, audio_data)
 
             if audio_data:
                 # Play audio
                 self.player.play_audio_data(audio_data)
 
-                # Wait for playback to complete
-                while self.player.is_playing:
-                    time.sleep(0.1)
+                # Wait for playback to complete (signalled by the player, no polling);
+                # the timeout only guards against a playback thread that died mid-item
+                while not self.player.done_event.wait(timeout=1.0):
+                    if not self.player.playback_thread.is_alive():
+                        break
 
         except Exception as e:
             logger.error(f"Speech synthesis failed: {e}")
@@ -456,6 +709,74 @@ class JarvisTTS:
             if self.on_speech_end_callback:
                 self.on_speech_end_callback()
 
+    def _synthesize(self, text: str) -> bytes:
+        """Synthesize with the configured engine, cloning the Jarvis voice when set"""
+        if isinstance(self.tts_engine, CoquiTTS) and self.jarvis_voice_path:
+            # Use voice cloning if available
+            return self.tts_engine.clone_voice(text, self.jarvis_voice_path)
+        return self.tts_engine.synthesize(text)
+
+    def _canned_audio_key(self, text: str) -> str:
+        """Cache key for a phrase: hash of the text, engine, model and voice settings"""
+        engine_id = "|".join((
+            type(self.tts_engine).__name__,
+            getattr(self.tts_engine, 'model_name', ''),
+            str(self.jarvis_voice_path),
+            str(self.config.voice_speed),
+            str(self.config.voice_volume),
+            text,
+        ))
+        return hashlib.blake2b(engine_id.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _cached_audio(self, text: str) -> Optional[bytes]:
+        """Synthesized audio for a canned phrase from RAM or disk, or None"""
+        if not self.cache_canned_audio or text not in self._canned_texts:
+            return None
+        key = self._canned_audio_key(text)
+        with self._audio_cache_lock:
+            audio_data = self._audio_cache.get(key)
+            if audio_data is not None:
+                self._audio_cache.move_to_end(key)
+                return audio_data
+        try:
+            with open(os.path.join(CANNED_AUDIO_CACHE_DIR, f"{key}.pcm"), 'rb') as f:
+                audio_data = f.read()
+        except OSError:
+            return None
+        self._remember_audio(key, audio_data)
+        return audio_data
+
+    def _store_cached_audio(self, text: str, audio_data: bytes):
+        """Keep a canned phrase's audio in RAM and atomically on disk (failures are only logged)"""
+        if not audio_data or not self.cache_canned_audio or text not in self._canned_texts:
+            return
+        key = self._canned_audio_key(text)
+        self._remember_audio(key, audio_data)
+        try:
+            os.makedirs(CANNED_AUDIO_CACHE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=CANNED_AUDIO_CACHE_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio_data)
+            os.replace(tmp_path, os.path.join(CANNED_AUDIO_CACHE_DIR, f"{key}.pcm"))
+        except OSError as e:
+            logger.warning(f"Could not cache synthesized audio: {e}")
+
+    def _remember_audio(self, key: str, audio_data: bytes):
+        """Insert into the in-memory LRU, evicting the oldest entry past audio_cache_size"""
+        with self._audio_cache_lock:
+            self._audio_cache[key] = audio_data
+            self._audio_cache.move_to_end(key)
+            if len(self._audio_cache) > self.audio_cache_size:
+                self._audio_cache.popitem(last=False)
+
+    def prewarm_canned_audio(self):
+        """Synthesize every canned phrase not cached yet (one-time cost, e.g. at startup)"""
+        if self.tts_engine is None or not self.cache_canned_audio:
+            return
+        for text in self._canned_texts:
+            if self._cached_audio(text) is None:
+                self._store_cached_audio(text, self._synthesize(text))
+
     def speak_contextual(self, response_type: str, **kwargs):
         """Speak contextual response"""
         response = self.personality.get_contextual_response(response_type, **kwargs)
@@ -495,10 +816,13 @@ class JarvisTTS:
         """Stop current speech"""
         self.player.stop_playback()
         
-        # Stop non-blocking speech thread if running
-        if self.non_blocking_tts and self.is_speech_thread_running:
-            self.is_speech_thread_running = False
-            self.speech_queue.put(None)  # Send shutdown signal
+        # Stop non-blocking speech thread if running; later speech gets a fresh queue
+        # and worker, as the stopping one may still be mid-batch
+        with self._speech_lock:
+            if self.non_blocking_tts and self.is_speech_thread_running:
+                self.is_speech_thread_running = False
+                self.speech_queue.put(None)  # Send shutdown signal
+                self.speech_queue = queue.SimpleQueue()
 
     def set_jarvis_voice(self, voice_sample_path: str):
         """Set Jarvis voice sample for cloning"""
@@ -543,6 +867,52 @@ class JarvisTTS:
 
 # Voice training utilities
 
+def _silent_ms_mask(samples, frame_rate, channels, min_silence_ms, thresh_energy):
+    """Per-millisecond silence mask: True inside any min_silence_ms window whose
+    energy is below thresh_energy (pydub's detect_silence with seek_step=1, one pass)"""
+    n_ms = len(samples) // channels * 1000 // frame_rate
+    # Cumulative energy per millisecond, so every window's energy is one subtraction;
+    # millisecond i starts at frame round(i * frame_rate / 1000), like pydub's slicing
+    # (a whole number of samples per ms would drift at 22.05/44.1 kHz)
+    energy = np.zeros(n_ms + 1)
+    end = 0
+    for i in range(n_ms):
+        total = 0.0
+        base = end
+        end = int(round((i + 1) * frame_rate / 1000)) * channels
+        for j in range(base, end):
+            value = float(samples[j])
+            total += value * value
+        energy[i + 1] = energy[i] + total
+    
+    silent = np.zeros(n_ms, dtype=np.bool_)
+    covered = 0
+    for start in range(n_ms - min_silence_ms + 1):
+        end = start + min_silence_ms
+        if energy[end] - energy[start] < thresh_energy:
+            for k in range(max(start, covered), end):
+                silent[k] = True
+            covered = end
+    return silent
+
+
+if njit is not None:
+    # Compiled once and cached on disk; the pure-Python loop is only usable through numba
+    _silent_ms_mask = njit(cache=True)(_silent_ms_mask)
+
+
+def _nonsilent_ranges(samples: np.ndarray, frame_rate: int, channels: int,
+                      min_silence_ms: int, silence_thresh_db: float) -> List[tuple]:
+    """[start_ms, end_ms) ranges of 16-bit audio that aren't silence"""
+    # dBFS threshold as total window energy (full scale is 32768 for 16-bit)
+    window_samples = min_silence_ms * frame_rate * channels / 1000
+    thresh_energy = (32768.0 * 10 ** (silence_thresh_db / 20)) ** 2 * window_samples
+    silent = _silent_ms_mask(samples, frame_rate, channels, min_silence_ms, thresh_energy)
+    # Edges of the non-silent runs, padding with silence on both ends
+    edges = np.flatnonzero(np.diff(np.concatenate(([True], silent, [True])).astype(np.int8)))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
 class JarvisVoiceTrainer:
     """Train Jarvis voice from audio samples - The voice coach"""
 
@@ -550,6 +920,13 @@ class JarvisVoiceTrainer:
     def __init__(self, training_data_dir: str = "jarvis_training_data"):
         self.training_dir = Path(training_data_dir)
         self.training_dir.mkdir(exist_ok=True)
+        
+        if njit is not None:
+            # Load (or compile) the silence scan now rather than on the first segment_audio call;
+            # real input is a read-only np.frombuffer view, which numba compiles separately
+            threading.Thread(target=_silent_ms_mask,
+                             args=(np.frombuffer(bytes(2), dtype=np.int16), 1000, 1, 1, 0.0),
+                             daemon=True).start()
 
     def extract_audio_from_video(self, video_path: str, output_dir: str = None):
         """Extract audio from video files (Iron Man clips)"""
@@ -578,37 +955,68 @@ class JarvisVoiceTrainer:
 
     def segment_audio(self, audio_path: str, output_dir: str = None):
         """Segment audio into sentences using silence detection"""
-        if output_dir is None:
-            output_dir = self.training_dir / "segments"
-
         try:
             from pydub import AudioSegment
-            from pydub.silence import split_on_silence
 
             # Load audio
-            audio = AudioSegment.from_wav(audio_path)
+            self._segment(AudioSegment.from_wav(audio_path), output_dir)
+            
+        except Exception as e:
+            logger.error(f"Audio segmentation failed: {e}")
 
-            # Split on silence
+    def segment_video(self, video_path: str, output_dir: str = None):
+        """Extract and segment a video's audio in one go, streaming PCM from ffmpeg (no WAV on disk)"""
+        try:
+            import subprocess
+            from pydub import AudioSegment
+
+            # Raw 16-bit mono PCM on stdout: no container to write, reread and parse
+            cmd = [
+                "ffmpeg", "-i", video_path,
+                "-f", "s16le",
+                "-acodec", "pcm_s16le",
+                "-ar", "22050",
+                "-ac", "1",
+                "-"
+            ]
+            pcm = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+            
+            self._segment(AudioSegment(data=pcm, sample_width=2, frame_rate=22050, channels=1), output_dir)
+            
+        except Exception as e:
+            logger.error(f"Video segmentation failed: {e}")
+
+    def _segment(self, audio, output_dir: str = None):
+        """Split a pydub AudioSegment on silence and save the pieces longer than a second"""
+        from pydub.silence import split_on_silence
+
+        if output_dir is None:
+            output_dir = self.training_dir / "segments"
+
+        # Split on silence
+        if njit is not None and audio.sample_width == 2:
+            # Same split as pydub's, with the per-millisecond scan compiled by numba
+            samples = np.frombuffer(audio.raw_data, dtype=np.int16)
+            ranges = _nonsilent_ranges(samples, audio.frame_rate, audio.channels,
+                                       min_silence_ms=500, silence_thresh_db=audio.dBFS - 14)
+            chunks = [audio[max(0, start - 100):end + 100] for start, end in ranges]
+        else:
             chunks = split_on_silence(
                 audio,
                 min_silence_len=500,  # 0.5 seconds
                 silence_thresh=audio.dBFS - 14,
                 keep_silence=100
             )
-            
-            # Save segments
-            output_dir = Path(output_dir)
-            output_dir.mkdir(exist_ok=True)
-            
-            for i, chunk in enumerate(chunks):
-                if len(chunk) > 1000:  # Only save chunks > 1 second
-                    chunk.export(output_dir / f"segment_{i:03d}.wav", format="wav")
-            
-            logger.info(f"Audio segmented into {len(chunks)} pieces")
-            
-        except Exception as e:
-            logger.error(f"Audio segmentation failed: {e}")
-
+        
+        # Save segments
+        output_dir = Path(output_dir)
+        output_dir.mkdir(exist_ok=True)
+        
+        for i, chunk in enumerate(chunks):
+            if len(chunk) > 1000:  # Only save chunks > 1 second
+                chunk.export(output_dir / f"segment_{i:03d}.wav", format="wav")
+        
+        logger.info(f"Audio segmented into {len(chunks)} pieces")
 
 # Example usage and testing
 
@@ -8,7 +8,9 @@ import os
 import logging
 
 # Add the speech_analysis directory to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'speech_analysis'))
+SPEECH_ANALYSIS_DIR = os.path.join(os.path.dirname(__file__), 'speech_analysis')
+if SPEECH_ANALYSIS_DIR not in sys.path:
+    sys.path.append(SPEECH_ANALYSIS_DIR)
 
 from tts import PyttsxTTS, TTSConfig
 
@@ -126,6 +128,8 @@ def test_save_audio_file(audio_data):
             wav_file.setnchannels(1)  # Mono
             wav_file.setsampwidth(2)  # 16-bit
             wav_file.setframerate(22050)  # Sample rate
+            # Header gets the final length up front, so it isn't rewritten after the data
+            wav_file.setnframes(len(audio_data) // 2)
             wav_file.writeframes(audio_data)
         
         # Check file size
@@ -155,19 +159,21 @@ def test_voice_properties(tts):
         print("Testing different speech rates...")
         rates_to_test = [120, 180, 240]  # slow, normal, fast
         
+        # pyttsx3 runs property changes and utterances from one command queue, in order,
+        # so all three rates play in a single runAndWait instead of one engine run each
         for rate in rates_to_test:
             print(f"Setting rate to {rate} WPM...")
             engine.setProperty('rate', rate)
-            actual_rate = engine.getProperty('rate')
-            print(f"Actual rate: {actual_rate}")
             
             # Test speech at this rate
             test_text = f"This is speech at {rate} words per minute."
-            print(f"Speaking: '{test_text}'")
-            tts.speak_directly(test_text)
+            print(f"Queued: '{test_text}'")
+            engine.say(test_text)
         
-        # Reset to default
+        # Reset to default (applied after the last utterance)
         engine.setProperty('rate', 180)
+        engine.runAndWait()
+        print(f"Rate after test: {engine.getProperty('rate')}")
         print("✅ Voice property test completed")
         return True
         
@@ -2,15 +2,22 @@
 
 import time
 import datetime
+import signal
+import threading
 import logging
+import logging.handlers
 from speech_analysis.stt import JarvisSTT
 
-# Set up detailed logging
+# Set up detailed logging; the log file is written in batches of 64 records
+# (sooner for warnings, e.g. wake words, and at exit) rather than once per record
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+file_handler = logging.FileHandler('stt_transcription_log.txt', delay=True)
+file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('stt_transcription_log.txt'),
+        logging.handlers.MemoryHandler(64, flushLevel=logging.WARNING, target=file_handler),
         logging.StreamHandler()
     ]
 )
@@ -24,7 +31,7 @@ start_time = None
 def on_speech(text):
     global transcription_count
     transcription_count += 1
-    timestamp = datetime.datetime.now().strftime('%H:%M:%S')
+    timestamp = time.strftime('%H:%M:%S')
     
     # Log and print the transcription
     message = f"[{timestamp}] TRANSCRIPTION #{transcription_count}: '{text}'"
@@ -34,13 +41,13 @@ def on_speech(text):
     # Log transcription statistics
     if text.strip():
         word_count = len(text.split())
-        logger.info(f"Word count: {word_count} words")
+        logger.info("Word count: %d words", word_count)
         print(f"   📊 Word count: {word_count} words")
 
 def on_wake_word():
     global wake_word_count
     wake_word_count += 1
-    timestamp = datetime.datetime.now().strftime('%H:%M:%S')
+    timestamp = time.strftime('%H:%M:%S')
     
     # Log and print wake word detection
     message = f"[{timestamp}] 🚨 WAKE WORD DETECTED! (#{wake_word_count})"
@@ -68,16 +75,17 @@ print("="*60)
 start_time = datetime.datetime.now()
 logger.info(f"Starting continuous transcription test at {start_time}")
 
+# Ctrl+C sets the event; the main thread sleeps on it with no periodic wakeups
+stop_event = threading.Event()
+signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
 try:
     jarvis.start_listening()
     print(f"\n✅ Started listening at {start_time.strftime('%H:%M:%S')}")
     print("🔊 Speak clearly and I'll transcribe everything...\n")
     
     # Keep running until interrupted
-    while True:
-        time.sleep(1)
-        
-except KeyboardInterrupt:
+    stop_event.wait()
     print("\n\n⏹️  Stopping transcription...")
     logger.info("Transcription stopped by user")
 finally:
@@ -7,18 +7,39 @@ This script tests initialization, transcription, and error handling of the Whisp
 import sys
 import os
 import numpy as np
-import wave
+import mmap
+import struct
 import logging
 
 # Add the project root to the path so we can import from speech_analysis
-sys.path.insert(0, os.path.abspath('.'))
+if os.path.abspath('.') not in sys.path:
+    sys.path.insert(0, os.path.abspath('.'))
 
-from speech_analysis.stt import WhisperSTT, AudioConfig
+from speech_analysis.stt import WhisperSTT, FasterWhisperSTT, AudioBuffer, AudioConfig
 
 # Configure logging for better debugging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# One generator for all synthetic noise inputs, seeded so runs see the same inputs
+_rng = np.random.default_rng(42)
+
+def read_wav_samples(path):
+    """int16 samples of a PCM WAV as a zero-copy view over a read-only mmap of the file"""
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    # Walk the RIFF chunks to 'data' (the header isn't always the canonical 44 bytes)
+    offset = 12
+    while offset + 8 <= len(mm):
+        chunk_id = mm[offset:offset + 4]
+        size = struct.unpack_from('<I', mm, offset + 4)[0]
+        if chunk_id == b'data':
+            size = min(size, len(mm) - offset - 8)
+            return np.frombuffer(mm, dtype=np.int16, count=size // 2, offset=offset + 8)
+        offset += 8 + size + (size & 1)
+    raise ValueError(f"No data chunk in {path}")
+
 def test_whisper_initialization():
     """Test WhisperSTT initialization with different models."""
     print("=" * 60)
@@ -49,11 +70,14 @@ def test_whisper_with_audio_file(whisper_stt, audio_file_path):
         config = AudioConfig()
         duration = 2.0  # 2 seconds
         sample_rate = config.sample_rate
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
         
-        # Generate a simple sine wave (440 Hz)
+        # Generate a simple sine wave (440 Hz), in place in one float32 buffer
         frequency = 440.0
-        audio_data = (np.sin(frequency * 2 * np.pi * t) * 16383).astype(np.int16)
+        phase = np.arange(int(sample_rate * duration), dtype=np.float32)
+        phase *= np.float32(2 * np.pi * frequency / sample_rate)
+        np.sin(phase, out=phase)
+        phase *= 16383
+        audio_data = phase.astype(np.int16)
         
         print(f"   📊 Generated synthetic audio: {len(audio_data)} samples, {duration}s duration")
         
@@ -69,10 +93,8 @@ def test_whisper_with_audio_file(whisper_stt, audio_file_path):
     else:
         print(f"   📁 Found audio file: {audio_file_path}")
         try:
-            # Read the actual audio file
-            with wave.open(audio_file_path, 'rb') as wav_file:
-                frames = wav_file.readframes(wav_file.getnframes())
-                audio_data = np.frombuffer(frames, dtype=np.int16)
+            # Read the actual audio file (mapped, not copied)
+            audio_data = read_wav_samples(audio_file_path)
                 
             config = AudioConfig()
             print(f"   📊 Audio data: {len(audio_data)} samples")
@@ -102,7 +124,7 @@ def test_error_handling(whisper_stt):
     # Test with very short audio
     print("   Testing with very short audio (10 samples):")
     try:
-        short_audio = np.random.randint(-1000, 1000, 10, dtype=np.int16)
+        short_audio = _rng.integers(-1000, 1000, 10, dtype=np.int16)
         result = whisper_stt.transcribe(short_audio, config)
         print(f"   ✅ Short audio handled: '{result}'")
     except Exception as e:
@@ -131,7 +153,7 @@ def test_unavailable_whisper():
             
             # Test transcription when unavailable
             config = AudioConfig()
-            test_audio = np.random.randint(-1000, 1000, 1000, dtype=np.int16)
+            test_audio = _rng.integers(-1000, 1000, 1000, dtype=np.int16)
             result = whisper_bad.transcribe(test_audio, config)
             print(f"   ✅ Unavailable Whisper transcription result: '{result}'")
         else:
@@ -140,6 +162,37 @@ def test_unavailable_whisper():
     except Exception as e:
         print(f"   ⚠️  Exception during bad model test (this might be expected): {e}")
 
+def test_forced_stop_batching():
+    """Test that an utterance cut off at max_recording_time takes faster-whisper's batched GPU path."""
+    print("\n5. Testing forced-stop batching (default config, no model needed):")
+    
+    config = AudioConfig()
+    buffer = AudioBuffer()
+    loud_chunk = np.full(config.chunk_size, 8000, dtype=np.int16)
+    
+    # Continuous loud audio: only the max_recording_time stop can end the utterance
+    max_chunks = int(config.max_recording_time * config.sample_rate / config.chunk_size) + 10
+    complete = False
+    for _ in range(max_chunks):
+        if buffer.add_chunk(loud_chunk, config):
+            complete = True
+            break
+    
+    num_samples = len(buffer)
+    print(f"   📊 Forced stop after {num_samples} samples (limit {config.max_recording_time * config.sample_rate:.0f})")
+    if not complete or not buffer.hit_max_length:
+        print("   ❌ Max-length stop was not flagged")
+        return False
+    
+    # Routing only: a bare engine on a pretend GPU, no model loaded
+    engine = FasterWhisperSTT.__new__(FasterWhisperSTT)
+    engine.device = "cuda"
+    if engine._use_batched(num_samples, buffer.hit_max_length) and not engine._use_batched(num_samples, False):
+        print("   ✅ Forced stop takes the batched path")
+        return True
+    print("   ❌ Forced stop did not take the batched path")
+    return False
+
 def run_comprehensive_test():
     """Run all WhisperSTT tests."""
     print("🚀 Starting Comprehensive WhisperSTT Test Suite")
@@ -149,7 +202,8 @@ def run_comprehensive_test():
         'initialization': False,
         'transcription': False,
         'error_handling': True,  # Assume this passes unless it fails
-        'unavailable_handling': True
+        'unavailable_handling': True,
+        'forced_stop_batching': False
     }
     
     # Test 1: Initialization
@@ -166,13 +220,10 @@ def run_comprehensive_test():
             os.path.expanduser("~/Downloads/test_audio.wav"),
         ]
         
-        transcription_success = False
-        for audio_path in test_audio_paths:
-            if test_whisper_with_audio_file(whisper_stt, audio_path):
-                transcription_success = True
-                break
-        
-        test_results['transcription'] = transcription_success
+        # Probe the candidates up front: a missing file falls back to (and succeeds with)
+        # synthetic audio, so trying them in turn would never reach a later real file
+        audio_path = next((path for path in test_audio_paths if os.path.exists(path)), test_audio_paths[0])
+        test_results['transcription'] = test_whisper_with_audio_file(whisper_stt, audio_path)
         
         # Test 3: Error handling
         try:
@@ -193,6 +244,12 @@ def run_comprehensive_test():
         print(f"   ❌ Unavailable Whisper test failed: {e}")
         test_results['unavailable_handling'] = False
     
+    # Test 5: Forced-stop batching
+    try:
+        test_results['forced_stop_batching'] = test_forced_stop_batching()
+    except Exception as e:
+        print(f"   ❌ Forced-stop batching test failed: {e}")
+    
     # Print summary
     print("\n" + "=" * 80)
     print("🏁 Test Summary")